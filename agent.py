@@ -1,75 +1,463 @@
 import ollama
+import asyncio
 import os
+import re
+import sys
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import httpx
+
+from assistant.agent_memory import TieredMemory
+from assistant.path_policy import PathPolicy
+from assistant.semcache import SemanticCache
+
+# Ollama server concurrency defaults (respected by `ollama serve` when it
+# inherits this environment, e.g. launched from the same shell/session).
+# The stock defaults under-parallelize: multiple in-flight requests get
+# serialized instead of batched into one forward pass, and the model is
+# evicted between turns. setdefault keeps explicit user settings intact.
+os.environ.setdefault("OLLAMA_NUM_PARALLEL", "4")
+os.environ.setdefault("OLLAMA_MAX_LOADED_MODELS", "2")
+os.environ.setdefault("OLLAMA_KEEP_ALIVE", "30m")
+
+# One model for every turn: reusing the already-loaded model keeps its
+# weights hot and lets the server reuse the conversation's KV cache
+# instead of cold-loading a second model for the post-tool response.
+# Default is a Q4_K_M quant: roughly half the weight bytes per decoded
+# token vs FP16 on memory-bound consumer GPUs, and small enough to fit
+# alongside the assistant's STT/TTS models. Override with AGENT_MODEL.
+MODEL = os.environ.get("AGENT_MODEL", "llama3.2:3b-instruct-q4_K_M")
+
+# Stable prefix for every turn. Kept byte-identical (no timestamps or
+# interpolation) so the server's prefix-KV cache hits on each request
+# and only the new tokens of a turn need prefilling.
+SYSTEM_PROMPT = """You are a local file agent. You can read and write files \
+on the user's machine with the read_file and write_file tools.
+
+Guidelines:
+- Only touch files the user explicitly asked about
+- Confirm what you did after a write
+- Keep answers short and factual"""
+
+# Passed on every generation: cache_prompt lets the llama.cpp backend
+# keep the KV cache of the shared prompt prefix between requests, so
+# only tokens after the first divergence are re-prefilled each turn.
+CHAT_OPTIONS = {'cache_prompt': True, 'num_ctx': 8192}
+
+
+async def warm_keepalive(interval=25.0):
+    """
+    Background task: ping the server periodically so the model (and its
+    prefix KV cache) are never evicted while the user is idle at the
+    prompt. Each ping is a zero-token request against the warm prefix.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await _client.chat(
+                model=MODEL,
+                messages=[{'role': 'system', 'content': SYSTEM_PROMPT}],
+                keep_alive='30m',
+                options={**CHAT_OPTIONS, 'num_predict': 0},
+            )
+        except Exception:
+            pass  # transient server hiccups shouldn't kill the session
+
+
+async def warm_prefix():
+    """
+    Prefill the system prompt once at startup and pin the model in memory.
+
+    A zero-token generation forces the server to build the KV cache for
+    the stable prefix; keep_alive keeps model + cache resident so every
+    later turn only prefills its own new tokens.
+    """
+    try:
+        await _client.chat(
+            model=MODEL,
+            messages=[{'role': 'system', 'content': SYSTEM_PROMPT}],
+            keep_alive='1h',
+            options={**CHAT_OPTIONS, 'num_predict': 0},
+        )
+    except Exception as e:
+        # Warm-up is best-effort; a cold first turn still works
+        print(f"⚠️  Prefix warm-up failed: {e}")
+
+# Single client shared by every chat() call. The default module-level
+# ollama.chat() helpers don't guarantee connection reuse; one Client with
+# generous keep-alive limits means the TCP handshake is paid once per
+# session instead of twice per turn.
+_client = ollama.AsyncClient(
+    host=os.environ.get("OLLAMA_HOST", "http://localhost:11434"),
+    timeout=httpx.Timeout(300.0, connect=10.0),
+    limits=httpx.Limits(max_keepalive_connections=16, keepalive_expiry=30.0),
+)
+
+# Every model-supplied path is checked against one precompiled
+# allowlist regex before any file operation runs
+_path_policy = PathPolicy()
 
 # 1. Define the tools (The "Hands" you give the model)
 def read_file(filepath):
     """Reads a file from the local system."""
+    if not _path_policy.allows(filepath):
+        return f"Error: path not permitted by policy: {filepath}"
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return f.read()
+        # Raw fd read: one os.read into a single buffer, one decode.
+        # Skips the TextIOWrapper layer and its incremental-decode copies.
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+            if hasattr(os, 'posix_fadvise'):
+                # Tell the kernel we'll read it all, so readahead primes
+                # the page cache before os.read blocks (no-op on Windows)
+                os.posix_fadvise(
+                    fd, 0, size,
+                    os.POSIX_FADV_SEQUENTIAL | os.POSIX_FADV_WILLNEED,
+                )
+            buf = os.read(fd, size)
+        finally:
+            os.close(fd)
+        return buf.decode('utf-8', errors='replace')
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
+@lru_cache(maxsize=128)
+def _read_file_cached(filepath, mtime_ns):
+    # mtime_ns is only part of the key: a changed file busts its entry
+    return read_file(filepath)
+
+def read_file_cached(filepath):
+    """read_file with an LRU cache keyed on (path, mtime)."""
+    try:
+        mtime_ns = os.stat(filepath).st_mtime_ns
+    except OSError:
+        return read_file(filepath)  # let read_file produce the error string
+    return _read_file_cached(filepath, mtime_ns)
+
+def batch_read(paths):
+    """
+    Read many files concurrently on a small thread pool. Repeat reads of
+    unchanged files are served from the LRU cache without touching disk.
+    """
+    with ThreadPoolExecutor(max_workers=min(8, len(paths))) as pool:
+        return dict(zip(paths, pool.map(read_file_cached, paths)))
+
 def write_file(filepath, content):
     """Writes content to a file. WARNING: Overwrites existing files."""
+    if not _path_policy.allows(filepath):
+        return f"Error: path not permitted by policy: {filepath}"
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # Atomic + durable: write a sibling temp file, fsync it, then
+        # rename over the target. A crash mid-write can never leave a
+        # half-written file for the model to read back as truth.
+        dirname = os.path.dirname(os.path.abspath(filepath)) or '.'
+        fd, tmp_path = tempfile.mkstemp(prefix='.wf_', dir=dirname)
+        data = content.encode('utf-8')
+        fd_open = True
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+            os.close(fd)
+            fd_open = False
+            os.replace(tmp_path, filepath)
+        except Exception:
+            if fd_open:
+                os.close(fd)
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        if len(data) > (8 << 20) and hasattr(os, 'posix_fadvise'):
+            # Large one-shot write: hint the kernel to drop the cold
+            # pages so they don't evict read_file's warm cache
+            fd2 = os.open(filepath, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd2, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd2)
         return f"Successfully wrote to {filepath}"
     except Exception as e:
         return f"Error writing file: {str(e)}"
 
+# Tool registry: dict-hash dispatch instead of an if/elif ladder, and a
+# single place to add new tools or wrap every entry with common
+# validation/telemetry decorators. Each callable takes the
+# model-supplied arguments dict.
+TOOLS = {
+    'read_file': lambda args: read_file(args['filepath']),
+    'write_file': lambda args: write_file(args['filepath'], args['content']),
+}
+
+# Tool schemas built once at import. Passing the raw functions makes
+# ollama-python re-introspect signatures and docstrings into JSON schema
+# on every chat() call; a prebuilt list of dicts skips that entirely.
+TOOLS_SCHEMA = [
+    {
+        'type': 'function',
+        'function': {
+            'name': 'read_file',
+            'description': 'Reads a file from the local system.',
+            'parameters': {
+                'type': 'object',
+                'properties': {
+                    'filepath': {
+                        'type': 'string',
+                        'description': 'Path of the file to read',
+                    },
+                },
+                'required': ['filepath'],
+            },
+        },
+    },
+    {
+        'type': 'function',
+        'function': {
+            'name': 'write_file',
+            'description': 'Writes content to a file. WARNING: Overwrites existing files.',
+            'parameters': {
+                'type': 'object',
+                'properties': {
+                    'filepath': {
+                        'type': 'string',
+                        'description': 'Path of the file to write',
+                    },
+                    'content': {
+                        'type': 'string',
+                        'description': 'Full content to write to the file',
+                    },
+                },
+                'required': ['filepath', 'content'],
+            },
+        },
+    },
+]
+
+# Caps for tool output shipped back into the context: a multi-MB file
+# blown into the prompt tanks prefill time and can evict the rest of
+# the conversation from the context window
+MAX_TOOL_OUTPUT_BYTES = 64 * 1024
+_TOOL_OUTPUT_HEAD = 48 * 1024
+_TOOL_OUTPUT_TAIL = 8 * 1024
+
+def cap_tool_output(content):
+    """
+    Bound a tool result to MAX_TOOL_OUTPUT_BYTES (measured in UTF-8
+    bytes). Oversized results keep their head and tail with an elision
+    marker in between, so the model still sees both ends of the file.
+    """
+    data = content.encode('utf-8', 'replace')
+    if len(data) <= MAX_TOOL_OUTPUT_BYTES:
+        return content
+    elided = len(data) - _TOOL_OUTPUT_HEAD - _TOOL_OUTPUT_TAIL
+    head = data[:_TOOL_OUTPUT_HEAD].decode('utf-8', errors='replace')
+    tail = data[-_TOOL_OUTPUT_TAIL:].decode('utf-8', errors='replace')
+    return f"{head}\n…[{elided} bytes elided]…\n{tail}"
+
+class TokenSink:
+    """
+    Buffered stdout writer for streamed tokens. Flushing every token is
+    a syscall per token; batching to sentence boundaries (or 50 ms,
+    whichever comes first) keeps the stream feeling live while cutting
+    write+flush syscalls by an order of magnitude.
+    """
+
+    FLUSH_INTERVAL = 0.05
+
+    def __init__(self):
+        self.buf = []
+        self.last_flush = time.monotonic()
+
+    def write(self, token):
+        self.buf.append(token)
+        now = time.monotonic()
+        if token.endswith(('.', '!', '?', '\n')) or now - self.last_flush > self.FLUSH_INTERVAL:
+            self.flush(now)
+
+    def flush(self, now=None):
+        if self.buf:
+            sys.stdout.write(''.join(self.buf))
+            sys.stdout.flush()
+            self.buf.clear()
+        self.last_flush = now if now is not None else time.monotonic()
+
+
+# Matches a completed "filepath" string value inside (possibly partial)
+# tool-call argument JSON - close-quote seen means the path is final
+_FILEPATH_RE = re.compile(r'"filepath"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+async def stream_chat(prefix="Agent: ", **chat_kwargs):
+    """
+    Run chat with stream=True, printing tokens as they arrive.
+    Returns the reassembled message (content + tool_calls) so the caller
+    can keep using the same non-streaming logic afterwards.
+
+    While tool-call arguments are still streaming in, any read_file
+    filepath that has already closed is prefetched on a worker thread,
+    so the disk read overlaps the model's remaining decode time.
+    """
+    content_parts = []
+    tool_calls = []
+    printed_prefix = False
+    prefetch = {}
+    arg_buf = ""
+    sink = TokenSink()
+
+    def _maybe_prefetch(path):
+        if path and path not in prefetch:
+            prefetch[path] = asyncio.create_task(
+                asyncio.to_thread(read_file_cached, path)
+            )
+
+    chat_kwargs.setdefault('options', CHAT_OPTIONS)
+    async for chunk in await _client.chat(stream=True, **chat_kwargs):
+        token = chunk.message.content
+        if token:
+            if not printed_prefix:
+                sink.write(prefix)
+                printed_prefix = True
+            sink.write(token)
+            content_parts.append(token)
+        if chunk.message.tool_calls:
+            for tc in chunk.message.tool_calls:
+                args = tc.function.arguments
+                if isinstance(args, str):
+                    # Argument JSON arriving as text deltas: scan the
+                    # accumulated buffer for completed filepath values
+                    arg_buf += args
+                    for m in _FILEPATH_RE.finditer(arg_buf):
+                        _maybe_prefetch(m.group(1))
+                elif tc.function.name == 'read_file' and isinstance(args, dict):
+                    _maybe_prefetch(args.get('filepath'))
+            tool_calls.extend(chunk.message.tool_calls)
+
+    if printed_prefix:
+        sink.write("\n")
+    sink.flush()
+
+    return {
+        'role': 'assistant',
+        'content': ''.join(content_parts),
+        'tool_calls': tool_calls,
+        'prefetch': prefetch,
+    }
+
 # 2. Main Chat Loop
-def run_chat():
+async def run_chat():
     print("🤖 File Agent Initialized. (Type 'quit' to exit)")
     print("⚠️  Warning: This agent can OVERWRITE your files. Use with caution.\n")
-    
-    # History of the conversation
-    messages = []
 
-    while True:
-        user_input = input("You: ")
-        if user_input.lower() in ['quit', 'exit']: break
+    # Build the system-prefix KV cache before the first user turn, then
+    # keep it warm in the background while the REPL waits for input
+    await warm_prefix()
+    keepalive_task = asyncio.create_task(warm_keepalive())
 
-        # Add user message to history
-        messages.append({'role': 'user', 'content': user_input})
+    # Tiered history: recent turns verbatim, older turns summarized and
+    # recalled by similarity, so prompt size stays bounded as the
+    # session grows. The stable system prompt always sits at index 0 so
+    # the server-side prefix cache keeps hitting.
+    memory = TieredMemory(_client, MODEL, SYSTEM_PROMPT)
 
-        # Send to Ollama with access to our tools
-        response = ollama.chat(
-            model='glm-4.7:cloud', # Make sure you have this model pulled
-            messages=messages,
-            tools=[read_file, write_file], # <--- Giving the tools here
-        )
+    # Near-duplicate prompts skip the model entirely
+    cache = SemanticCache(_client)
+
+    try:
+        while True:
+            # Read stdin on a worker thread so the event loop stays free for
+            # the keepalive pings and any still-running background work
+            user_input = (await asyncio.to_thread(input, "You: ")).strip()
+            if user_input.lower() in ['quit', 'exit']: break
+
+            cached = await cache.lookup(user_input)
+            if cached is not None:
+                print(f"Agent: {cached}")
+                await memory.append({'role': 'user', 'content': user_input})
+                await memory.append({'role': 'assistant', 'content': cached})
+                continue
+
+            # Add user message to history
+            await memory.append({'role': 'user', 'content': user_input})
+            messages = await memory.build_context(user_input)
+
+            # Send to Ollama with access to our tools (streamed so tokens
+            # appear as they are generated instead of after full completion)
+            response = await stream_chat(
+                model=MODEL,
+                messages=messages,
+                tools=TOOLS_SCHEMA, # <--- Giving the tools here (prebuilt schemas)
+            )
+            # Prefetch tasks are transport-local, not part of the message
+            prefetch = response.pop('prefetch')
+
+            # Check if the model wants to use a tool
+            if response['tool_calls']:
+                # Collect all reads into one batched (and cached) call; writes
+                # run on worker threads alongside it. N reads cost max(latency)
+                # instead of the sum, and repeat reads are memory hits.
+                read_paths = []
+                pending = []  # (tool, kind, payload) in original call order
+                for tool in response['tool_calls']:
+                    func_name = tool.function.name
+                    args = tool.function.arguments
+                    print(f"⚙️  Model is calling tool: {func_name} on {args.get('filepath')}")
+
+                    if func_name == 'read_file':
+                        path = args['filepath']
+                        if path in prefetch:
+                            # Already reading since the path closed mid-stream
+                            pending.append((tool, 'task', prefetch[path]))
+                        else:
+                            read_paths.append(path)
+                            pending.append((tool, 'read', path))
+                    elif func_name in TOOLS:
+                        task = asyncio.create_task(
+                            asyncio.to_thread(TOOLS[func_name], args)
+                        )
+                        pending.append((tool, 'task', task))
+                    else:
+                        pending.append((tool, 'error', "Error: Unknown tool"))
+
+                read_results = await asyncio.to_thread(batch_read, read_paths) if read_paths else {}
+
+                # Feed the tool outputs back in a short-lived scratch list,
+                # preserving call order. Each result is linked to its call by
+                # tool_call_id; the verbose tool-call echo never enters
+                # long-term history, so later turns don't re-prefill it.
+                scratch = [response]
+                for tool, kind, payload in pending:
+                    if kind == 'read':
+                        output = read_results[payload]
+                    elif kind == 'task':
+                        output = await payload
+                    else:
+                        output = payload
+                    scratch.append({
+                        'role': 'tool',
+                        'tool_call_id': getattr(tool, 'id', None) or tool.function.name,
+                        'content': cap_tool_output(output),
+                    })
+
+                # Get the model's final response after the tool usage (also streamed)
+                messages = await memory.build_context(user_input) + scratch
+                final_response = await stream_chat(model=MODEL, messages=messages)
+                final_response.pop('prefetch')
+                await memory.append(final_response)
+
+            else:
+                # Standard response if no file access was needed (already printed
+                # token-by-token by stream_chat). Tool-using turns are not
+                # cached - their answers depend on filesystem state.
+                await memory.append(response)
+                await cache.put(user_input, response['content'])
 
-        # Check if the model wants to use a tool
-        if response.message.tool_calls:
-            for tool in response.message.tool_calls:
-                
-                # Perform the actual file operation
-                func_name = tool.function.name
-                args = tool.function.arguments
-                print(f"⚙️  Model is calling tool: {func_name} on {args.get('filepath')}")
-
-                if func_name == 'read_file':
-                    output = read_file(args['filepath'])
-                elif func_name == 'write_file':
-                    output = write_file(args['filepath'], args['content'])
-                else:
-                    output = "Error: Unknown tool"
-
-                # Feed the tool output back to the model so it knows what happened
-                messages.append(response.message)
-                messages.append({'role': 'tool', 'content': output, 'name': func_name})
-
-            # Get the model's final response after the tool usage
-            final_response = ollama.chat(model='llama3.2', messages=messages)
-            print(f"Agent: {final_response.message.content}")
-            messages.append(final_response.message)
-
-        else:
-            # Standard response if no file access was needed
-            print(f"Agent: {response.message.content}")
-            messages.append(response.message)
+    finally:
+        keepalive_task.cancel()
+        # Close the pooled httpx transports on the loop that opened
+        # them; doing this from atexit would run after asyncio.run has
+        # already closed the loop and raise 'Event loop is closed'
+        await _client._client.aclose()
 
 if __name__ == "__main__":
-    run_chat()
\ No newline at end of file
+    asyncio.run(run_chat())
\ No newline at end of file
@@ -1,13 +1,24 @@
 """
 Buddy Voice Assistant - Core Package
+
+Submodules are loaded lazily (PEP 562): importing the package is
+effectively free, and the audio/STT/TTS stacks with their native libs
+and model weights are only pulled in when their classes are first
+touched. Lightweight consumers (agent.py, tests, headless jobs) no
+longer pay for PyAudio, Whisper and friends at import time.
 """
-from .audio_manager import AudioManager
-from .wake_word import WakeWordDetector
-from .stt import SpeechToText
-from .tts import TextToSpeech
-from .llm_router import LLMRouter
+import importlib
+
 from .personality import SYSTEM_PROMPT
 
+_LAZY = {
+    "AudioManager": "audio_manager",
+    "WakeWordDetector": "wake_word",
+    "SpeechToText": "stt",
+    "TextToSpeech": "tts",
+    "LLMRouter": "llm_router",
+}
+
 __all__ = [
     "AudioManager",
     "WakeWordDetector",
@@ -16,3 +27,17 @@ __all__ = [
     "LLMRouter",
     "SYSTEM_PROMPT",
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value  # cache so __getattr__ runs once per symbol
+    return value
+
+
+def __dir__():
+    return sorted(__all__)
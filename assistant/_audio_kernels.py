@@ -0,0 +1,25 @@
+"""
+Audio Kernels - fused numeric helpers for the audio hot paths
+"""
+import numpy as np
+
+# The int16 -> normalized-float32 step runs ~30x/s during listening.
+# The naive astype()/divide idiom makes two passes and two allocations;
+# a fused kernel writes the caller's preallocated buffer in one pass.
+# numba compiles it to a vectorized loop when available; the numpy
+# fallback uses a single ufunc call with an unsafe cast, which is also
+# one pass and zero temporaries - just without fastmath.
+try:
+    from numba import njit
+
+    @njit(cache=True, fastmath=True)
+    def int16_to_float32(src: np.ndarray, dst: np.ndarray) -> None:
+        """Normalize int16 samples into a preallocated float32 buffer"""
+        for i in range(src.size):
+            dst[i] = src[i] * (1.0 / 32768.0)
+
+except ImportError:
+
+    def int16_to_float32(src: np.ndarray, dst: np.ndarray) -> None:
+        """Normalize int16 samples into a preallocated float32 buffer"""
+        np.multiply(src, np.float32(1.0 / 32768.0), out=dst, casting='unsafe')
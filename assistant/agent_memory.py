@@ -0,0 +1,110 @@
+"""
+Agent Memory - Tiered conversation memory for the file agent CLI
+
+Keeps prompt size bounded instead of shipping the whole history every
+turn: a short-term ring buffer of recent messages, a mid-term tier of
+LLM-written summaries, and embedding-based retrieval so only relevant
+older context re-enters the prompt.
+"""
+import numpy as np
+from collections import deque
+from typing import Any, Dict, List
+
+
+class TieredMemory:
+    """
+    Three-tier memory: recent messages verbatim, older turns compacted
+    into summaries, summaries recalled by cosine similarity to the query.
+
+    Short-term: deque of the last `recent_limit` messages, sent as-is.
+    Mid-term: when the deque overflows, the evicted batch is summarized
+    by the model and stored alongside its embedding.
+    Retrieval: top-k summaries most similar to the current query are
+    injected as a single context note.
+    """
+
+    SUMMARIZE_PROMPT = (
+        "Summarize the following conversation excerpt in 2-3 sentences. "
+        "Keep concrete facts: file names, contents discussed, decisions made."
+    )
+
+    def __init__(self, client, model: str, system_prompt: str,
+                 embed_model: str = "mxbai-embed-large",
+                 recent_limit: int = 16, top_k: int = 3):
+        self.client = client  # ollama.AsyncClient, shared with the agent
+        self.model = model
+        self.embed_model = embed_model
+        self.system_prompt = system_prompt
+        self.top_k = top_k
+        self.recent_limit = recent_limit
+        self.recent: deque = deque()
+        self.summaries: List[str] = []
+        self.embeddings: List[np.ndarray] = []
+
+    async def append(self, msg: Dict[str, Any]) -> None:
+        """Add a message; compact the oldest half when the buffer overflows"""
+        self.recent.append(msg)
+        if len(self.recent) > self.recent_limit:
+            batch = [self.recent.popleft() for _ in range(self.recent_limit // 2)]
+            await self._summarize(batch)
+
+    async def _summarize(self, batch: List[Dict[str, Any]]) -> None:
+        """Compact a batch of evicted messages into one embedded summary"""
+        transcript = "\n".join(
+            f"{m.get('role', '?')}: {m.get('content', '')}" for m in batch
+        )
+        try:
+            response = await self.client.chat(
+                model=self.model,
+                messages=[
+                    {'role': 'system', 'content': self.SUMMARIZE_PROMPT},
+                    {'role': 'user', 'content': transcript},
+                ],
+            )
+            summary = response['message']['content']
+            # Embed before appending: if the embed call fails, neither
+            # list grows, keeping summaries and embeddings index-aligned
+            # (an orphan summary would shift every _recall argsort hit)
+            embedding = await self._embed(summary)
+            self.summaries.append(summary)
+            self.embeddings.append(embedding)
+        except Exception as e:
+            print(f"   ⚠️ Memory summarization failed, keeping raw turns: {e}")
+            self.recent.extendleft(reversed(batch))
+
+    async def _embed(self, text: str) -> np.ndarray:
+        """Embed text to a unit vector for cosine similarity"""
+        result = await self.client.embeddings(model=self.embed_model, prompt=text)
+        vec = np.asarray(result['embedding'], dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    async def build_context(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Build the message list for one model call: system prompt, any
+        relevant recalled summaries, then the recent messages verbatim.
+        """
+        messages: List[Dict[str, Any]] = [
+            {'role': 'system', 'content': self.system_prompt}
+        ]
+        notes = await self._recall(query)
+        if notes:
+            messages.append({
+                'role': 'system',
+                'content': "Relevant earlier context:\n" + "\n".join(notes),
+            })
+        messages.extend(self.recent)
+        return messages
+
+    async def _recall(self, query: str) -> List[str]:
+        """Top-k stored summaries by cosine similarity to the query"""
+        if not self.summaries:
+            return []
+        try:
+            q = await self._embed(query)
+            scores = np.stack(self.embeddings) @ q
+            top = np.argsort(scores)[::-1][:self.top_k]
+            return [self.summaries[i] for i in top]
+        except Exception as e:
+            print(f"   ⚠️ Memory recall failed: {e}")
+            return []
@@ -1,34 +1,288 @@
 from __future__ import annotations
 
+import concurrent.futures
+import ctypes
+import functools
 import logging
 import platform
+import queue
+import threading
 import time
-import os
-import subprocess
-from typing import List, Optional
-
-import pyautogui
-from comtypes import CLSCTX_ALL
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+from typing import Dict, List, Optional
 
 from assistant.app_scanner import AppManager
 
 IS_WINDOWS = platform.system() == "Windows"
 if IS_WINDOWS:
     try:
-        import psutil
         import win32con
         import win32gui
         import win32process
     except Exception:
         # fall back gracefully if pywin32 not available
         win32gui = win32con = win32process = None
-        import psutil  # psutil usually available or will raise
 
 logger = logging.getLogger("AI_Assistant.AppController")
+# Tracebacks are expensive to format; only attach them when debug
+# logging is on (checked once at import, not per error)
+_LOG_TB = logger.isEnabledFor(logging.DEBUG)
+
+# Heavy third-party modules are imported on first use, not at module
+# import: pyautogui pulls in Pillow and probes the display, pycaw spins
+# up COM, psutil walks /proc equivalents. Users who never issue an app
+# command never pay for them, and startup drops by a few hundred ms.
+_pyautogui = None
+_psutil = None
+
+
+def _pag():
+    """Memoized pyautogui import; configures it once on first load"""
+    global _pyautogui
+    if _pyautogui is None:
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        # No global pause: 0.4 s after *every* press/write/hotkey made a
+        # ~10 primitive macro spend ~4 s asleep. Handlers sleep
+        # explicitly where an app genuinely needs time to react.
+        pyautogui.PAUSE = 0
+        _pyautogui = pyautogui
+    return _pyautogui
+
+
+def _ps():
+    """Memoized psutil import (fallback paths only)"""
+    global _psutil
+    if _psutil is None:
+        import psutil
+        _psutil = psutil
+    return _psutil
+
+# SendInput plumbing for batched unicode typing: one syscall posts the
+# whole string as KEYEVENTF_UNICODE down/up pairs, replacing pyautogui's
+# per-character translation layer and its per-key sleeps
+_INPUT_KEYBOARD = 1
+_KEYEVENTF_UNICODE = 0x0004
+_KEYEVENTF_KEYUP = 0x0002
+
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", ctypes.c_ushort),
+        ("wScan", ctypes.c_ushort),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", ctypes.c_void_p),
+    ]
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    # Never sent, but the union must be sized by its largest member
+    # (MOUSEINPUT, 32 bytes on Win64) or sizeof(_INPUT) comes out wrong
+    # and SendInput rejects every call with cbSize != sizeof(INPUT)
+    _fields_ = [
+        ("dx", ctypes.c_long),
+        ("dy", ctypes.c_long),
+        ("mouseData", ctypes.c_ulong),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", ctypes.c_void_p),
+    ]
+
+
+class _INPUT(ctypes.Structure):
+    class _U(ctypes.Union):
+        _fields_ = [("ki", _KEYBDINPUT), ("mi", _MOUSEINPUT)]
+
+    _anonymous_ = ("u",)
+    _fields_ = [("type", ctypes.c_ulong), ("u", _U)]
+
+
+# SendInput sends nothing when cbSize is wrong, and the only symptom is
+# every _fast_type/_send_macro call failing over to pyautogui. Fail
+# fast at import instead: 40 bytes on Win64, 28 on 32-bit Windows.
+if IS_WINDOWS:
+    assert ctypes.sizeof(_INPUT) == (
+        40 if ctypes.sizeof(ctypes.c_void_p) == 8 else 28
+    ), f"_INPUT is {ctypes.sizeof(_INPUT)} bytes, INPUT ABI mismatch"
+
+
+def _fast_type(text: str) -> None:
+    """
+    Type a string with a single SendInput call. Each UTF-16 code unit
+    becomes a keydown+keyup KEYEVENTF_UNICODE pair, so a 20-char query
+    costs microseconds instead of pyautogui's ~hundreds of ms.
+    """
+    if not text:
+        return
+    data = text.encode("utf-16-le")
+    codes = [int.from_bytes(data[i:i + 2], "little") for i in range(0, len(data), 2)]
+    n = len(codes) * 2
+    inputs = (_INPUT * n)()
+    for i, code in enumerate(codes):
+        for j, flags in enumerate(
+            (_KEYEVENTF_UNICODE, _KEYEVENTF_UNICODE | _KEYEVENTF_KEYUP)
+        ):
+            inp = inputs[2 * i + j]
+            inp.type = _INPUT_KEYBOARD
+            inp.ki.wVk = 0
+            inp.ki.wScan = code
+            inp.ki.dwFlags = flags
+    sent = ctypes.windll.user32.SendInput(n, inputs, ctypes.sizeof(_INPUT))
+    if sent != n:
+        raise ctypes.WinError()
+
+
+# Virtual-key codes for macro steps; letters/digits resolve via ord()
+_VK = {
+    "ctrl": 0x11,
+    "shift": 0x10,
+    "alt": 0x12,
+    "enter": 0x0D,
+    "tab": 0x09,
+    "backspace": 0x08,
+    "esc": 0x1B,
+    "space": 0x20,
+    "f5": 0x74,
+}
+
+
+def _vk_code(key: str) -> int:
+    code = _VK.get(key)
+    return code if code is not None else ord(key.upper())
+
+
+def _send_macro(steps) -> None:
+    """
+    Execute a whole input macro with as few SendInput calls as possible.
 
-pyautogui.FAILSAFE = False
-pyautogui.PAUSE = 0.4
+    Steps: ("hotkey", ["ctrl", "l"]), ("key", "enter"), ("text", "query")
+    or ("sleep", seconds). Contiguous input steps compile into one
+    INPUT buffer posted with a single SendInput; a sleep step flushes
+    the buffer first, so the only delays left are the ones an app
+    genuinely needs to react.
+    """
+    buf = []
+
+    def key_event(vk, up=False):
+        inp = _INPUT()
+        inp.type = _INPUT_KEYBOARD
+        inp.ki.wVk = vk
+        inp.ki.wScan = 0
+        inp.ki.dwFlags = _KEYEVENTF_KEYUP if up else 0
+        buf.append(inp)
+
+    def text_events(text):
+        data = text.encode("utf-16-le")
+        for i in range(0, len(data), 2):
+            code = int.from_bytes(data[i:i + 2], "little")
+            for flags in (_KEYEVENTF_UNICODE, _KEYEVENTF_UNICODE | _KEYEVENTF_KEYUP):
+                inp = _INPUT()
+                inp.type = _INPUT_KEYBOARD
+                inp.ki.wVk = 0
+                inp.ki.wScan = code
+                inp.ki.dwFlags = flags
+                buf.append(inp)
+
+    def flush():
+        if not buf:
+            return
+        arr = (_INPUT * len(buf))(*buf)
+        sent = ctypes.windll.user32.SendInput(len(buf), arr, ctypes.sizeof(_INPUT))
+        buf.clear()
+        if sent != len(arr):
+            raise ctypes.WinError()
+
+    for kind, arg in steps:
+        if kind == "sleep":
+            flush()
+            time.sleep(arg)
+        elif kind == "hotkey":
+            vks = [_vk_code(k) for k in arg]
+            for vk in vks:
+                key_event(vk)
+            for vk in reversed(vks):
+                key_event(vk, up=True)
+        elif kind == "key":
+            vk = _vk_code(arg)
+            key_event(vk)
+            key_event(vk, up=True)
+        elif kind == "text":
+            text_events(arg)
+        else:
+            raise ValueError(f"Unknown macro step: {kind}")
+    flush()
+
+
+# Process-name snapshot, cached briefly so tight poll loops (e.g.
+# wait_for_app_start) don't re-walk the process table every iteration
+_PROC_SNAPSHOT_TTL = 0.25
+_proc_snapshot_cache = (0.0, ())
+
+
+def _process_names_snapshot() -> tuple:
+    """
+    Lowercased exe names of all running processes via one direct
+    CreateToolhelp32Snapshot walk - no psutil Process objects, one
+    syscall-bounded pass, results cached for a 250 ms window.
+    """
+    global _proc_snapshot_cache
+    now = time.monotonic()
+    stamp, names = _proc_snapshot_cache
+    if now - stamp < _PROC_SNAPSHOT_TTL:
+        return names
+
+    TH32CS_SNAPPROCESS = 0x00000002
+    INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+    class PROCESSENTRY32W(ctypes.Structure):
+        _fields_ = [
+            ("dwSize", ctypes.c_ulong),
+            ("cntUsage", ctypes.c_ulong),
+            ("th32ProcessID", ctypes.c_ulong),
+            ("th32DefaultHeapID", ctypes.c_void_p),
+            ("th32ModuleID", ctypes.c_ulong),
+            ("cntThreads", ctypes.c_ulong),
+            ("th32ParentProcessID", ctypes.c_ulong),
+            ("pcPriClassBase", ctypes.c_long),
+            ("dwFlags", ctypes.c_ulong),
+            ("szExeFile", ctypes.c_wchar * 260),
+        ]
+
+    k32 = ctypes.windll.kernel32
+    # Without restype ctypes truncates the HANDLE to a signed 32-bit
+    # int, so a failed snapshot (-1) never equals INVALID_HANDLE_VALUE
+    # and the guard below is dead; c_void_p argtypes likewise keep the
+    # 64-bit handle intact when passed back in
+    k32.CreateToolhelp32Snapshot.restype = ctypes.c_void_p
+    k32.CreateToolhelp32Snapshot.argtypes = (ctypes.c_ulong, ctypes.c_ulong)
+    k32.Process32FirstW.argtypes = (ctypes.c_void_p, ctypes.c_void_p)
+    k32.Process32NextW.argtypes = (ctypes.c_void_p, ctypes.c_void_p)
+    k32.CloseHandle.argtypes = (ctypes.c_void_p,)
+    snapshot = k32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if not snapshot or snapshot == INVALID_HANDLE_VALUE:
+        return names  # stale-but-usable beats failing
+
+    collected = []
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        if k32.Process32FirstW(snapshot, ctypes.byref(entry)):
+            while True:
+                collected.append(entry.szExeFile.lower())
+                if not k32.Process32NextW(snapshot, ctypes.byref(entry)):
+                    break
+    finally:
+        k32.CloseHandle(snapshot)
+
+    names = tuple(collected)
+    _proc_snapshot_cache = (now, names)
+    return names
+
+class _StopEnum(Exception):
+    """Sentinel to abort a win32gui.EnumWindows sweep on first match.
+
+    Returning False from the callback is ignored by some pywin32 builds,
+    so raising is the only reliable early exit."""
 
 
 class AppController:
@@ -41,15 +295,77 @@ class AppController:
         self.system = platform.system()
         self.active_app: Optional[str] = None
         self.active_window_handle: Optional[int] = None
-        try:
-            devices = AudioUtilities.GetSpeakers()
-            interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-            self.volume = interface.QueryInterface(IAudioEndpointVolume)
-        except Exception:
-            self.volume = None
+
+        # 1 ms scheduler tick: the default 15.625 ms tick rounds every
+        # short sleep/wait up to ~16 ms, which adds up across the
+        # condition-driven waits below. Matched by timeEndPeriod in
+        # __del__.
+        self._timer_period_set = False
+        if IS_WINDOWS:
+            try:
+                ctypes.windll.winmm.timeBeginPeriod(1)
+                self._timer_period_set = True
+            except Exception:
+                pass
+
+        # Capability flag frozen once: handlers short-circuit on a bool
+        # instead of re-checking the platform (and logging a warning)
+        # on every call
+        self._win_ok = IS_WINDOWS and win32gui is not None
+        if not self._win_ok:
+            logger.warning(
+                "Windows app control unavailable (platform=%s, pywin32=%s); "
+                "app commands will be disabled.",
+                self.system, "ok" if win32gui is not None else "missing",
+            )
+        # Volume endpoint is activated lazily: COM + pycaw only spin up
+        # on the first volume command (see _volume_iface)
+        self.volume = None
+        self._vol_init = False
+
+        # Cached master volume (0.0-1.0): rapid "volume up x5" sequences
+        # pay one Set COM call each instead of a Get+Set roundtrip pair.
+        # Refreshed when stale in case another app moved the volume.
+        self._vol_cache: Optional[float] = None
+        self._vol_cache_stamp = 0.0
+        self._vol_cache_ttl = 5.0
 
         # Initialize App Scanner
         self.app_scanner = AppManager()
+        # Memoized launch lookups: normalized query -> (match, path, stamp)
+        self._launch_cache = {}
+        self._launch_cache_ttl = 60.0
+
+        # Single worker so UI automation stays sequential (you can't
+        # focus two windows at once) while the voice thread never waits
+        self._exec = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="AppCtl"
+        )
+        self._last_future: Optional[concurrent.futures.Future] = None
+
+        # Live window index: hwnd -> casefolded title, kept current by a
+        # WinEvent hook so title lookups are a dict probe instead of an
+        # EnumWindows sweep (one GetWindowText syscall per open window).
+        self._window_index: Dict[int, str] = {}
+        self._hwnd_cache: Dict[str, tuple] = {}  # needle -> (hwnd, timestamp)
+        self._hwnd_cache_ttl = 5.0
+        self._win_event_proc = None  # keep callback alive for ctypes
+        if IS_WINDOWS and win32gui is not None:
+            threading.Thread(
+                target=self._window_watch_loop, daemon=True, name="WinEventHook"
+            ).start()
+
+        # Process-creation events: wait_for_app_start blocks on this
+        # queue and wakes the moment the process exists, instead of
+        # polling the process table every 500 ms
+        # Bounded: events accumulate whenever no wait is active, and an
+        # unbounded queue would grow for the life of the process
+        self._proc_events: queue.Queue = queue.Queue(maxsize=256)
+        self._proc_watch_ok = False
+        if IS_WINDOWS:
+            threading.Thread(
+                target=self._process_watch_loop, daemon=True, name="ProcWatch"
+            ).start()
 
         self.app_commands = {
             "spotify": {
@@ -61,34 +377,6 @@ class AppController:
                 "volume_up": self._spotify_volume_up,
                 "volume_down": self._spotify_volume_down,
             },
-            "chrome": {
-                "new_tab": self._chrome_new_tab,
-                "close_tab": self._chrome_close_tab,
-                "search": self._chrome_search,
-                "go_to": self._chrome_goto,
-                "find_on_page": lambda **k: self._browser_find_on_page("chrome", **k),
-            },
-            "edge": {
-                "new_tab": self._edge_new_tab,
-                "close_tab": self._edge_close_tab,
-                "search": self._edge_search,
-                "go_to": self._edge_goto,
-                "find_on_page": lambda **k: self._browser_find_on_page("edge", **k),
-            },
-            "brave": {
-                "new_tab": self._brave_new_tab,
-                "close_tab": self._brave_close_tab,
-                "search": self._brave_search,
-                "go_to": self._brave_goto,
-                "find_on_page": lambda **k: self._browser_find_on_page("brave", **k),
-            },
-            "opera": {
-                "new_tab": self._opera_new_tab,
-                "close_tab": self._opera_close_tab,
-                "search": self._opera_search,
-                "go_to": self._opera_goto,
-                "find_on_page": lambda **k: self._browser_find_on_page("opera", **k),
-            },
             "notepad": {
                 "type": self._notepad_type,
                 "save": self._notepad_save,
@@ -108,6 +396,219 @@ class AppController:
             },
         }
 
+        # Browsers share one parametric handler: every (browser, action)
+        # pair is a partial specialized at registration time, so there's
+        # a single hot find+focus+input path instead of 16 copies
+        for app in ("chrome", "edge", "brave", "opera"):
+            self.app_commands[app] = {
+                cmd: functools.partial(self._browser_action, app, cmd)
+                for cmd in ("new_tab", "close_tab", "search", "go_to")
+            }
+            self.app_commands[app]["find_on_page"] = functools.partial(
+                self._browser_find_on_page, app
+            )
+
+        # Flat dispatch table: one hash probe per command instead of two
+        # nested lookups. app_commands stays around only for the
+        # list_supported_apps / list_app_commands introspection helpers.
+        self._dispatch = {
+            (app, cmd): fn
+            for app, cmds in self.app_commands.items()
+            for cmd, fn in cmds.items()
+        }
+
+    def __del__(self):
+        if getattr(self, "_timer_period_set", False):
+            try:
+                ctypes.windll.winmm.timeEndPeriod(1)
+            except Exception:
+                pass
+
+    def _wait_fg(self, hwnd: int, timeout_ms: int = 250) -> bool:
+        """
+        Wait until hwnd owns the foreground, polling at the 1 ms tick.
+        Replaces fixed 100-250 ms sleeps: typical foreground switches
+        complete in a few ms, so this returns 10-50x sooner on average.
+        """
+        deadline = time.monotonic() + timeout_ms / 1000.0
+        while time.monotonic() < deadline:
+            if win32gui.GetForegroundWindow() == hwnd:
+                return True
+            time.sleep(0.001)
+        return win32gui.GetForegroundWindow() == hwnd
+
+    def _type_text(self, text: str) -> None:
+        """Batched SendInput typing on Windows, pyautogui elsewhere"""
+        if IS_WINDOWS:
+            try:
+                _fast_type(text)
+                return
+            except Exception:
+                logger.error("SendInput typing failed; falling back to pyautogui", exc_info=_LOG_TB)
+        _pag().write(text, interval=0)
+
+    def _run_macro(self, steps) -> None:
+        """_send_macro on Windows; step-by-step pyautogui fallback elsewhere"""
+        if IS_WINDOWS:
+            try:
+                _send_macro(steps)
+                return
+            except Exception:
+                logger.error("SendInput macro failed; falling back to pyautogui", exc_info=_LOG_TB)
+        for kind, arg in steps:
+            if kind == "sleep":
+                time.sleep(arg)
+            elif kind == "hotkey":
+                _pag().hotkey(*arg)
+            elif kind == "key":
+                _pag().press(arg)
+            elif kind == "text":
+                _pag().write(arg, interval=0)
+
+    # ==================== Window index (WinEvent hook) ====================
+    def _index_window(self, hwnd: int) -> None:
+        """Add/refresh one hwnd in the index (visible, titled windows only)"""
+        try:
+            if win32gui.IsWindowVisible(hwnd):
+                title = win32gui.GetWindowText(hwnd)
+                if title:
+                    self._window_index[hwnd] = title.casefold()
+                    return
+            self._window_index.pop(hwnd, None)
+        except Exception:
+            self._window_index.pop(hwnd, None)
+
+    def _seed_window_index(self) -> None:
+        """One initial EnumWindows sweep; afterwards events keep us current"""
+        def callback(hwnd, _):
+            self._index_window(hwnd)
+            return True
+        try:
+            win32gui.EnumWindows(callback, None)
+        except Exception:
+            logger.error("Initial window enumeration failed", exc_info=_LOG_TB)
+
+    def _window_watch_loop(self) -> None:
+        """
+        Worker thread: registers a WinEvent hook for window create /
+        destroy / name-change and pumps messages so the callback fires.
+        The index it maintains turns find_window_by_title into a dict
+        probe with zero syscalls per lookup.
+        """
+        from ctypes import wintypes
+
+        EVENT_OBJECT_CREATE = 0x8000
+        EVENT_OBJECT_DESTROY = 0x8001
+        EVENT_OBJECT_NAMECHANGE = 0x800C
+        WINEVENT_OUTOFCONTEXT = 0x0000
+        OBJID_WINDOW = 0
+
+        self._seed_window_index()
+
+        user32 = ctypes.windll.user32
+        WinEventProcType = ctypes.WINFUNCTYPE(
+            None,
+            wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD,
+        )
+
+        def on_event(hook, event, hwnd, id_object, id_child, thread_id, timestamp):
+            if not hwnd or id_object != OBJID_WINDOW:
+                return
+            if event == EVENT_OBJECT_DESTROY:
+                self._window_index.pop(hwnd, None)
+            else:
+                self._index_window(hwnd)
+
+        self._win_event_proc = WinEventProcType(on_event)
+        hook = user32.SetWinEventHook(
+            EVENT_OBJECT_CREATE, EVENT_OBJECT_NAMECHANGE,
+            0, self._win_event_proc, 0, 0, WINEVENT_OUTOFCONTEXT,
+        )
+        if not hook:
+            logger.warning("SetWinEventHook failed; falling back to EnumWindows lookups")
+            return
+
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+
+    def _process_watch_loop(self) -> None:
+        """
+        Worker thread: subscribe to WMI process-creation events and push
+        new process names (lowercased) onto self._proc_events. COM is
+        initialized in-thread; on any setup failure the flag stays False
+        and wait_for_app_start keeps its polling fallback.
+        """
+        try:
+            import pythoncom
+            import win32com.client
+
+            pythoncom.CoInitialize()
+            wmi = win32com.client.GetObject("winmgmts:")
+            watcher = wmi.ExecNotificationQuery(
+                "SELECT * FROM __InstanceCreationEvent WITHIN 0.1 "
+                "WHERE TargetInstance ISA 'Win32_Process'"
+            )
+        except Exception as e:
+            logger.warning("WMI process watch unavailable, will poll instead: %s", e)
+            return
+
+        self._proc_watch_ok = True
+        while True:
+            try:
+                event = watcher.NextEvent(500)
+                name = str(event.TargetInstance.Name).lower()
+                try:
+                    self._proc_events.put_nowait(name)
+                except queue.Full:
+                    # Nobody is waiting; drop the oldest, keep the newest
+                    try:
+                        self._proc_events.get_nowait()
+                    except queue.Empty:
+                        pass
+                    self._proc_events.put_nowait(name)
+            except Exception:
+                # NextEvent raises on its 500 ms timeout; just wait again
+                continue
+
+    # Hotkey actions shared by every supported browser
+    _BROWSER_HOTKEYS = {
+        "new_tab": (("ctrl", "t"), "Opened new tab in {app}"),
+        "close_tab": (("ctrl", "w"), "Closed tab in {app}"),
+    }
+
+    def _browser_action(self, app_name: str, action: str,
+                        query: str = "", url: str = "", **kwargs) -> str:
+        """One find+focus+input path for all browser commands"""
+        try:
+            if not self._ensure_windows():
+                return f"{app_name} operations are Windows-only"
+            handle = self.find_window_by_title(app_name)
+            if not handle:
+                return f"{app_name} window not found"
+            self.focus_window(handle)
+
+            hotkey = self._BROWSER_HOTKEYS.get(action)
+            if hotkey:
+                keys, message = hotkey
+                _pag().hotkey(*keys)
+                return message.format(app=app_name.title())
+
+            # search and go_to share the address-bar flow
+            target = query or url
+            self._run_macro([
+                ("hotkey", ["ctrl", "l"]),
+                ("sleep", 0.15),  # address bar focus
+                ("text", target),
+                ("key", "enter"),
+            ])
+            return f"Searching for '{target}' in {app_name.title()}"
+        except Exception:
+            logger.error("%s %s failed", app_name, action, exc_info=_LOG_TB)
+            return f"Failed to {action.replace('_', ' ')} in {app_name}"
+
     def _browser_find_on_page(self, app_name: str, query: str = "", **kwargs) -> str:
         """Generic Ctrl+F handler for browsers"""
         try:
@@ -119,42 +620,65 @@ class AppController:
                 return f"{app_name} window not found"
                 
             self.focus_window(handle)
-            time.sleep(0.1)
-            pyautogui.hotkey("ctrl", "f")
+            _pag().hotkey("ctrl", "f")
             time.sleep(0.3)
             
             if query:
-                pyautogui.write(query, interval=0.03)
-                pyautogui.press("enter")
+                self._type_text(query)
+                _pag().press("enter")
                 return f"Finding '{query}' on page"
             return "Opened find bar"
             
         except Exception:
-            logger.exception(f"{app_name} find on page failed")
+            logger.error(f"{app_name} find on page failed", exc_info=_LOG_TB)
             return f"Failed to find on page in {app_name}"
 
+    def _volume_iface(self):
+        """Activate the pycaw volume endpoint on first use and cache it"""
+        if not self._vol_init:
+            self._vol_init = True
+            try:
+                from comtypes import CLSCTX_ALL
+                from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+                devices = AudioUtilities.GetSpeakers()
+                interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+                self.volume = interface.QueryInterface(IAudioEndpointVolume)
+            except Exception:
+                self.volume = None
+        return self.volume
+
+    def _current_volume(self) -> float:
+        """Cached scalar volume, re-read from the endpoint only when stale"""
+        now = time.monotonic()
+        if (
+            self._vol_cache is None
+            or now - self._vol_cache_stamp > self._vol_cache_ttl
+        ):
+            self._vol_cache = self._volume_iface().GetMasterVolumeLevelScalar()
+            self._vol_cache_stamp = now
+        return self._vol_cache
+
     def set_volume(self, lvl: int) -> str:
-        if self.volume:
-            self.volume.SetMasterVolumeLevelScalar(max(0.0, min(1.0, lvl / 100.0)), None)
+        volume = self._volume_iface()
+        if volume:
+            scalar = max(0.0, min(1.0, lvl / 100.0))
+            volume.SetMasterVolumeLevelScalar(scalar, None)
+            self._vol_cache = scalar
+            self._vol_cache_stamp = time.monotonic()
             return f"Volume set to {lvl}%"
         return "Volume control unavailable"
 
     def change_volume(self, delta: int) -> str:
-        if not self.volume:
+        if not self._volume_iface():
             return "Volume control unavailable"
-        current = int(self.volume.GetMasterVolumeLevelScalar() * 100)
+        current = int(self._current_volume() * 100)
         new = max(0, min(100, current + delta))
         self.set_volume(new)
         return f"Volume {new}%"
 
     def _ensure_windows(self) -> bool:
-        if not IS_WINDOWS:
-            logger.warning("AppController feature is Windows-only on this build.")
-            return False
-        if win32gui is None:
-            logger.warning("pywin32 not available; limited window operations.")
-            return False
-        return True
+        # Frozen at construction; the warning was logged once there
+        return self._win_ok
 
     def find_window_by_title(
         self, title_contains: str, retries: int = 3, delay: float = 0.6
@@ -163,92 +687,156 @@ class AppController:
         if not self._ensure_windows():
             return None
 
-        title_contains = title_contains.lower()
+        needle = title_contains.casefold()
+
+        # Memoized hwnd for this needle: repeated commands against the
+        # same app skip the lookup entirely while the handle stays valid
+        cached = self._hwnd_cache.get(needle)
+        if cached:
+            hwnd, stamp = cached
+            if time.monotonic() - stamp < self._hwnd_cache_ttl and win32gui.IsWindow(hwnd):
+                return hwnd
+            self._hwnd_cache.pop(needle, None)
+
+        # Event-maintained index: a dict scan, no syscalls, no retry sleep
+        if self._window_index:
+            for hwnd, title in list(self._window_index.items()):
+                if needle in title:
+                    self._hwnd_cache[needle] = (hwnd, time.monotonic())
+                    return hwnd
+
+        # Fallback: full enumeration (index empty, e.g. hook failed)
+        min_len = len(needle)
         for attempt in range(retries):
             found_handle = None
 
             def callback(hwnd, _):
                 nonlocal found_handle
                 try:
-                    if win32gui.IsWindowVisible(hwnd):
-                        window_title = win32gui.GetWindowText(hwnd) or ""
-                        if title_contains in window_title.lower():
-                            found_handle = hwnd
-                            return False  # stop enumeration
+                    # Length probe first: skips the text-buffer allocation
+                    # for untitled windows (roughly half of all hwnds) and
+                    # for titles too short to ever contain the needle
+                    if (
+                        win32gui.GetWindowTextLength(hwnd) >= min_len
+                        and win32gui.IsWindowVisible(hwnd)
+                        and needle in win32gui.GetWindowText(hwnd).casefold()
+                    ):
+                        found_handle = hwnd
+                        raise _StopEnum
+                except _StopEnum:
+                    raise
                 except Exception:
                     pass
                 return True
 
             try:
                 win32gui.EnumWindows(callback, None)
-                if found_handle:
-                    return found_handle
+            except _StopEnum:
+                pass
             except Exception:
-                logger.exception("Window enumeration failed", exc_info=True)
+                logger.error("Window enumeration failed", exc_info=_LOG_TB)
+            if found_handle:
+                self._hwnd_cache[needle] = (found_handle, time.monotonic())
+                return found_handle
             time.sleep(delay)
         return None
 
     def focus_window(self, handle: int, fallback_click: bool = False) -> bool:
-        """Bring window to foreground using multiple aggressive techniques."""
+        """
+        Bring window to foreground deterministically. Attaching our input
+        queue to the foreground window's thread lifts Windows'
+        focus-stealing restriction, so one SetForegroundWindow suffices -
+        no Alt-press hack, no retry loop, no quarter-second sleeps.
+        """
         if not self._ensure_windows() or not handle:
             return False
         try:
             # 1. Force restore if minimized
             if win32gui.IsIconic(handle):
                 win32gui.ShowWindow(handle, win32con.SW_RESTORE)
-            
-            # 2. Key-press trick to allow background focus stealing
-            # Windows blocks SetForegroundWindow unless the calling process has input focus
-            # Pro-tip: Pressing 'Alt' sometimes bypasses this restriction
-            pyautogui.press('alt', interval=0.01) 
-            
-            # 3. Try standard SetForegroundWindow
-            try:
-                win32gui.SetForegroundWindow(handle)
-            except Exception:
-                # If that fails, try ShowWindow
-                win32gui.ShowWindow(handle, win32con.SW_SHOW)
-                win32gui.SetForegroundWindow(handle)
-            
-            time.sleep(0.25)
-            
-            # 4. Verify it worked
-            active_window = win32gui.GetForegroundWindow()
-            if active_window == handle:
+
+            fg_hwnd = win32gui.GetForegroundWindow()
+            if fg_hwnd == handle:
                 return True
-                
-            # 5. Retry loop
-            for _ in range(3):
-                win32gui.ShowWindow(handle, win32con.SW_SHOWMAXIMIZED)
+
+            # 2. Attach to the current foreground thread's input queue
+            user32 = ctypes.windll.user32
+            kernel32 = ctypes.windll.kernel32
+            fg_tid = user32.GetWindowThreadProcessId(fg_hwnd, None)
+            my_tid = kernel32.GetCurrentThreadId()
+            attached = False
+            if fg_tid and fg_tid != my_tid:
+                attached = bool(user32.AttachThreadInput(my_tid, fg_tid, True))
+
+            # 3. Single bring-to-top + foreground, then detach
+            try:
+                win32gui.BringWindowToTop(handle)
                 win32gui.SetForegroundWindow(handle)
-                time.sleep(0.2)
-                if win32gui.GetForegroundWindow() == handle:
-                    return True
-            
-            return False
-            
+            finally:
+                if attached:
+                    user32.AttachThreadInput(my_tid, fg_tid, False)
+
+            # 4. Condition-driven verification instead of a fixed sleep
+            return self._wait_fg(handle, 250)
+
         except Exception:
-            logger.exception("Failed to focus window")
-            return False
+            logger.error("Failed to focus window", exc_info=_LOG_TB)
             return False
 
     def is_app_running(self, app_name: str) -> bool:
         """Check if application is currently running."""
+        app_name_lower = app_name.lower()
+        if IS_WINDOWS:
+            try:
+                return any(app_name_lower in n for n in _process_names_snapshot())
+            except Exception:
+                logger.error("Toolhelp snapshot failed; falling back to psutil", exc_info=_LOG_TB)
         try:
-            app_name_lower = app_name.lower()
-            for proc in psutil.process_iter(["name"]):
+            for proc in _ps().process_iter(["name"]):
                 try:
                     pname = (proc.info.get("name") or "").lower()
                     if app_name_lower in pname:
                         return True
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                except (_ps().NoSuchProcess, _ps().AccessDenied):
                     continue
         except Exception:
-            logger.exception("is_app_running failed")
+            logger.error("is_app_running failed", exc_info=_LOG_TB)
         return False
 
     def wait_for_app_start(self, app_name: str, timeout: int = 10) -> bool:
         """Wait for application start; returns True if detected."""
+        if self.is_app_running(app_name):
+            time.sleep(1.0)
+            return True
+
+        needle = app_name.lower()
+        if self._proc_watch_ok:
+            # Discard events queued before this wait: a matching launch
+            # from minutes ago must not satisfy a fresh wait whose own
+            # launch may have failed
+            while True:
+                try:
+                    self._proc_events.get_nowait()
+                except queue.Empty:
+                    break
+
+            # Event-driven: wake the instant the process is created
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                try:
+                    name = self._proc_events.get(timeout=remaining)
+                except queue.Empty:
+                    # A process created between the drain above and our
+                    # first get() may have been lost; check once directly
+                    return self.is_app_running(app_name)
+                if needle in name:
+                    time.sleep(1.0)  # let the new process create its window
+                    return True
+
+        # Fallback: poll the (snapshot-cached) process table
         start = time.time()
         while time.time() - start < timeout:
             if self.is_app_running(app_name):
@@ -260,19 +848,27 @@ class AppController:
     def launch_app(self, app_name: str) -> str:
         """Launch an application using App Scanner."""
         logger.info(f"Attempting to launch: {app_name}")
-        
-        # 1. Check App Scanner
-        match = self.app_scanner.find_best_match(app_name)
+
+        # 1. Check App Scanner (memoized: repeated "open chrome" skips the
+        # fuzzy pass and the path lookup; 60s TTL picks up rescans)
+        key = app_name.strip().lower()
+        cached = self._launch_cache.get(key)
+        if cached and time.monotonic() - cached[2] < self._launch_cache_ttl:
+            match, path = cached[0], cached[1]
+        else:
+            match = self.app_scanner.find_best_match(app_name)
+            path = self.app_scanner.apps[match] if match else None
+            self._launch_cache[key] = (match, path, time.monotonic())
         if match:
-            path = self.app_scanner.apps[match]
             logger.info(f"Found match: {match} -> {path}")
             try:
-                if path.startswith("shell:"):
-                    # UWP apps
-                    subprocess.run(["start", path], shell=True, check=True)
-                else:
-                    # Normal apps
-                    os.startfile(path)
+                # ShellExecuteW handles both normal paths and shell:AppsFolder
+                # UWP monikers directly, with no cmd.exe in between
+                result = ctypes.windll.shell32.ShellExecuteW(
+                    None, "open", path, None, None, 1  # SW_SHOWNORMAL
+                )
+                if result <= 32:  # per ShellExecute docs, <=32 is an error code
+                    raise OSError(f"ShellExecuteW returned {result}")
                 return f"Launching {match}..."
             except Exception as e:
                 logger.error(f"Failed to launch {match}: {e}")
@@ -283,34 +879,34 @@ class AppController:
     # ==================== Spotify Controls ====================
     def _spotify_play(self, **kwargs) -> str:
         try:
-            pyautogui.press("playpause")
+            _pag().press("playpause")
             return "Playing Spotify"
         except Exception:
-            logger.exception("Spotify play failed")
+            logger.error("Spotify play failed", exc_info=_LOG_TB)
             return "Failed to play Spotify"
 
     def _spotify_pause(self, **kwargs) -> str:
         try:
-            pyautogui.press("playpause")
+            _pag().press("playpause")
             return "Paused Spotify"
         except Exception:
-            logger.exception("Spotify pause failed")
+            logger.error("Spotify pause failed", exc_info=_LOG_TB)
             return "Failed to pause Spotify"
 
     def _spotify_next(self, **kwargs) -> str:
         try:
-            pyautogui.press("nexttrack")
+            _pag().press("nexttrack")
             return "Playing next track"
         except Exception:
-            logger.exception("Spotify next failed")
+            logger.error("Spotify next failed", exc_info=_LOG_TB)
             return "Failed to skip track"
 
     def _spotify_previous(self, **kwargs) -> str:
         try:
-            pyautogui.press("prevtrack")
+            _pag().press("prevtrack")
             return "Playing previous track"
         except Exception:
-            logger.exception("Spotify previous failed")
+            logger.error("Spotify previous failed", exc_info=_LOG_TB)
             return "Failed to go to previous track"
 
     def _spotify_search(self, query: str = "", **kwargs) -> str:
@@ -332,250 +928,44 @@ class AppController:
             if win32gui.GetForegroundWindow() != handle:
                  return "Spotify failed to take focus."
 
-            # Open search (Ctrl+L)
-            pyautogui.hotkey("ctrl", "l")
-            time.sleep(0.2)
-            
-            # Clear text
-            pyautogui.hotkey("ctrl", "a")
-            time.sleep(0.05)
-            pyautogui.press("backspace")
-            
-            # Type slowly
-            pyautogui.write(query, interval=0.05)
-            time.sleep(0.5)
-            pyautogui.press("enter")
-            
-            # Wait for search results - Spotify can be slow
-            time.sleep(2.5)
-            
-            # Navigate to "Top Result"
-            # Sequence: Tab -> Tab -> Tab -> Enter
-            pyautogui.press("tab") 
-            time.sleep(0.1)
-            pyautogui.press("tab") # to All
-            time.sleep(0.1)
-            pyautogui.press("tab") # to Top Result
-            time.sleep(0.1)
-            pyautogui.press("enter") # Play
-            
+            # One macro: focus search bar, clear it, type, submit, then
+            # tab to "Top Result" and play. Only two real waits survive -
+            # the search-bar focus and Spotify's own result render.
+            self._run_macro([
+                ("hotkey", ["ctrl", "l"]),
+                ("sleep", 0.2),
+                ("hotkey", ["ctrl", "a"]),
+                ("key", "backspace"),
+                ("text", query),
+                ("key", "enter"),
+                ("sleep", 2.5),  # Spotify search-result render
+                ("key", "tab"),
+                ("key", "tab"),  # to All
+                ("key", "tab"),  # to Top Result
+                ("key", "enter"),  # Play
+            ])
+
             return f"Playing '{query}' on Spotify"
         except Exception:
-            logger.exception("Spotify search failed")
+            logger.error("Spotify search failed", exc_info=_LOG_TB)
             return "Spotify search failed"
 
     def _spotify_volume_up(self, **kwargs) -> str:
         try:
-            pyautogui.press("volumeup")
+            _pag().press("volumeup")
             return "Volume increased"
         except Exception:
-            logger.exception("Volume up failed")
+            logger.error("Volume up failed", exc_info=_LOG_TB)
             return "Failed to change volume"
 
     def _spotify_volume_down(self, **kwargs) -> str:
         try:
-            pyautogui.press("volumedown")
+            _pag().press("volumedown")
             return "Volume decreased"
         except Exception:
-            logger.exception("Volume down failed")
+            logger.error("Volume down failed", exc_info=_LOG_TB)
             return "Failed to change volume"
 
-    # ==================== Chrome Controls ====================
-    def _chrome_new_tab(self, **kwargs) -> str:
-        try:
-            if not self._ensure_windows():
-                return "Chrome operations are Windows-only in this build"
-            handle = self.find_window_by_title("chrome")
-            if handle:
-                self.focus_window(handle)
-                pyautogui.hotkey("ctrl", "t")
-                return "Opened new tab"
-            return "Chrome window not found"
-        except Exception:
-            logger.exception("Chrome new tab failed")
-            return "Failed to open new tab"
-
-    def _chrome_close_tab(self, **kwargs) -> str:
-        try:
-            if not self._ensure_windows():
-                return "Chrome operations are Windows-only"
-            handle = self.find_window_by_title("chrome")
-            if handle:
-                self.focus_window(handle)
-                pyautogui.hotkey("ctrl", "w")
-                return "Closed tab"
-            return "Chrome window not found"
-        except Exception:
-            logger.exception("Chrome close tab failed")
-            return "Failed to close tab"
-
-    def _chrome_search(self, query: str = "", **kwargs) -> str:
-        try:
-            if not self._ensure_windows():
-                return "Chrome operations are Windows-only"
-            handle = self.find_window_by_title("chrome")
-            if not handle:
-                return "Chrome window not found"
-            self.focus_window(handle)
-            pyautogui.hotkey("ctrl", "l")
-            time.sleep(0.15)
-            pyautogui.write(query, interval=0.03)
-            pyautogui.press("enter")
-            return f"Searching for '{query}'"
-        except Exception:
-            logger.exception("Chrome search failed")
-            return "Failed to search in Chrome"
-
-    def _chrome_goto(self, url: str = "", **kwargs) -> str:
-        return self._chrome_search(query=url)
-
-    # ==================== Microsoft Edge Controls ====================
-    def _edge_new_tab(self, **kwargs) -> str:
-        try:
-            if not self._ensure_windows():
-                return "Edge operations are Windows-only in this build"
-            handle = self.find_window_by_title("edge")
-            if handle:
-                self.focus_window(handle)
-                pyautogui.hotkey("ctrl", "t")
-                return "Opened new tab in Edge"
-            return "Edge window not found"
-        except Exception:
-            logger.exception("Edge new tab failed")
-            return "Failed to open new tab"
-
-    def _edge_close_tab(self, **kwargs) -> str:
-        try:
-            if not self._ensure_windows():
-                return "Edge operations are Windows-only"
-            handle = self.find_window_by_title("edge")
-            if handle:
-                self.focus_window(handle)
-                pyautogui.hotkey("ctrl", "w")
-                return "Closed Edge tab"
-            return "Edge window not found"
-        except Exception:
-            logger.exception("Edge close tab failed")
-            return "Failed to close tab"
-
-    def _edge_search(self, query: str = "", **kwargs) -> str:
-        try:
-            if not self._ensure_windows():
-                return "Edge operations are Windows-only"
-            handle = self.find_window_by_title("edge")
-            if not handle:
-                return "Edge window not found"
-            self.focus_window(handle)
-            pyautogui.hotkey("ctrl", "l")
-            time.sleep(0.15)
-            pyautogui.write(query, interval=0.03)
-            pyautogui.press("enter")
-            return f"Searching for '{query}' in Edge"
-        except Exception:
-            logger.exception("Edge search failed")
-            return "Failed to search in Edge"
-
-    def _edge_goto(self, url: str = "", **kwargs) -> str:
-        return self._edge_search(query=url)
-
-    # ==================== Brave Browser Controls ====================
-    def _brave_new_tab(self, **kwargs) -> str:
-        try:
-            if not self._ensure_windows():
-                return "Brave operations are Windows-only in this build"
-            handle = self.find_window_by_title("brave")
-            if handle:
-                self.focus_window(handle)
-                pyautogui.hotkey("ctrl", "t")
-                return "Opened new tab in Brave"
-            return "Brave window not found"
-        except Exception:
-            logger.exception("Brave new tab failed")
-            return "Failed to open new tab"
-
-    def _brave_close_tab(self, **kwargs) -> str:
-        try:
-            if not self._ensure_windows():
-                return "Brave operations are Windows-only"
-            handle = self.find_window_by_title("brave")
-            if handle:
-                self.focus_window(handle)
-                pyautogui.hotkey("ctrl", "w")
-                return "Closed Brave tab"
-            return "Brave window not found"
-        except Exception:
-            logger.exception("Brave close tab failed")
-            return "Failed to close tab"
-
-    def _brave_search(self, query: str = "", **kwargs) -> str:
-        try:
-            if not self._ensure_windows():
-                return "Brave operations are Windows-only"
-            handle = self.find_window_by_title("brave")
-            if not handle:
-                return "Brave window not found"
-            self.focus_window(handle)
-            pyautogui.hotkey("ctrl", "l")
-            time.sleep(0.15)
-            pyautogui.write(query, interval=0.03)
-            pyautogui.press("enter")
-            return f"Searching for '{query}' in Brave"
-        except Exception:
-            logger.exception("Brave search failed")
-            return "Failed to search in Brave"
-
-    def _brave_goto(self, url: str = "", **kwargs) -> str:
-        return self._brave_search(query=url)
-
-    # ==================== Opera Browser Controls ====================
-    def _opera_new_tab(self, **kwargs) -> str:
-        try:
-            if not self._ensure_windows():
-                return "Opera operations are Windows-only in this build"
-            handle = self.find_window_by_title("opera")
-            if handle:
-                self.focus_window(handle)
-                pyautogui.hotkey("ctrl", "t")
-                return "Opened new tab in Opera"
-            return "Opera window not found"
-        except Exception:
-            logger.exception("Opera new tab failed")
-            return "Failed to open new tab"
-
-    def _opera_close_tab(self, **kwargs) -> str:
-        try:
-            if not self._ensure_windows():
-                return "Opera operations are Windows-only"
-            handle = self.find_window_by_title("opera")
-            if handle:
-                self.focus_window(handle)
-                pyautogui.hotkey("ctrl", "w")
-                return "Closed Opera tab"
-            return "Opera window not found"
-        except Exception:
-            logger.exception("Opera close tab failed")
-            return "Failed to close tab"
-
-    def _opera_search(self, query: str = "", **kwargs) -> str:
-        try:
-            if not self._ensure_windows():
-                return "Opera operations are Windows-only"
-            handle = self.find_window_by_title("opera")
-            if not handle:
-                return "Opera window not found"
-            self.focus_window(handle)
-            pyautogui.hotkey("ctrl", "l")
-            time.sleep(0.15)
-            pyautogui.write(query, interval=0.03)
-            pyautogui.press("enter")
-            return f"Searching for '{query}' in Opera"
-        except Exception:
-            logger.exception("Opera search failed")
-            return "Failed to search in Opera"
-
-    def _opera_goto(self, url: str = "", **kwargs) -> str:
-        return self._opera_search(query=url)
-
     # ==================== Notepad Controls ====================
     def _notepad_type(self, text: str = "", **kwargs) -> str:
         try:
@@ -585,10 +975,10 @@ class AppController:
             if not handle:
                 return "Notepad window not found"
             self.focus_window(handle)
-            pyautogui.write(text, interval=0.02)
+            self._type_text(text)
             return "Typed text"
         except Exception:
-            logger.exception("Notepad type failed")
+            logger.error("Notepad type failed", exc_info=_LOG_TB)
             return "Failed to type in Notepad"
 
     def _notepad_save(self, filename: str = "document.txt", **kwargs) -> str:
@@ -599,13 +989,15 @@ class AppController:
             if not handle:
                 return "Notepad window not found"
             self.focus_window(handle)
-            pyautogui.hotkey("ctrl", "s")
-            time.sleep(0.5)
-            pyautogui.write(filename, interval=0.04)
-            pyautogui.press("enter")
+            self._run_macro([
+                ("hotkey", ["ctrl", "s"]),
+                ("sleep", 0.5),  # Save dialog open
+                ("text", filename),
+                ("key", "enter"),
+            ])
             return f"Saved as {filename}"
         except Exception:
-            logger.exception("Notepad save failed")
+            logger.error("Notepad save failed", exc_info=_LOG_TB)
             return "Failed to save Notepad file"
 
     # ==================== VS Code ====================
@@ -614,11 +1006,11 @@ class AppController:
             handle = self.find_window_by_title("visual studio code")
             if handle:
                 self.focus_window(handle)
-                pyautogui.hotkey("ctrl", "n")
+                _pag().hotkey("ctrl", "n")
                 return "Created new file"
             return "VS Code not found"
         except Exception:
-            logger.exception("VS Code new file failed")
+            logger.error("VS Code new file failed", exc_info=_LOG_TB)
             return "Failed to create file"
 
     def _vscode_save(self, **kwargs) -> str:
@@ -626,11 +1018,11 @@ class AppController:
             handle = self.find_window_by_title("visual studio code")
             if handle:
                 self.focus_window(handle)
-                pyautogui.hotkey("ctrl", "s")
+                _pag().hotkey("ctrl", "s")
                 return "File saved"
             return "VS Code not found"
         except Exception:
-            logger.exception("VS Code save failed")
+            logger.error("VS Code save failed", exc_info=_LOG_TB)
             return "Failed to save file"
 
     def _vscode_run(self, **kwargs) -> str:
@@ -638,11 +1030,11 @@ class AppController:
             handle = self.find_window_by_title("visual studio code")
             if handle:
                 self.focus_window(handle)
-                pyautogui.press("f5")
+                _pag().press("f5")
                 return "Running code"
             return "VS Code not found"
         except Exception:
-            logger.exception("VS Code run failed")
+            logger.error("VS Code run failed", exc_info=_LOG_TB)
             return "Failed to run code"
 
     # ==================== Discord ====================
@@ -652,12 +1044,11 @@ class AppController:
             if not handle:
                 return "Discord not found"
             self.focus_window(handle)
-            time.sleep(0.2)
-            pyautogui.write(message, interval=0.02)
-            pyautogui.press("enter")
+            self._type_text(message)
+            _pag().press("enter")
             return "Sent message"
         except Exception:
-            logger.exception("Discord send failed")
+            logger.error("Discord send failed", exc_info=_LOG_TB)
             return "Failed to send Discord message"
 
     def _discord_mute(self, **kwargs) -> str:
@@ -665,11 +1056,11 @@ class AppController:
             handle = self.find_window_by_title("discord")
             if handle:
                 self.focus_window(handle)
-                pyautogui.hotkey("ctrl", "shift", "m")
+                _pag().hotkey("ctrl", "shift", "m")
                 return "Toggled mute"
             return "Discord not found"
         except Exception:
-            logger.exception("Discord mute failed")
+            logger.error("Discord mute failed", exc_info=_LOG_TB)
             return "Failed to toggle mute"
 
     # ==================== WhatsApp ====================
@@ -679,12 +1070,11 @@ class AppController:
             if not handle:
                 return "WhatsApp not found"
             self.focus_window(handle)
-            time.sleep(0.25)
-            pyautogui.write(message, interval=0.02)
-            pyautogui.press("enter")
+            self._type_text(message)
+            _pag().press("enter")
             return "Sent WhatsApp message"
         except Exception:
-            logger.exception("WhatsApp send failed")
+            logger.error("WhatsApp send failed", exc_info=_LOG_TB)
             return "Failed to send WhatsApp message"
 
     def _whatsapp_search_contact(self, contact: str = "", **kwargs) -> str:
@@ -693,14 +1083,16 @@ class AppController:
             if not handle:
                 return "WhatsApp not found"
             self.focus_window(handle)
-            pyautogui.hotkey("ctrl", "f")
-            time.sleep(0.2)
-            pyautogui.write(contact, interval=0.03)
-            time.sleep(0.35)
-            pyautogui.press("enter")
+            self._run_macro([
+                ("hotkey", ["ctrl", "f"]),
+                ("sleep", 0.2),  # search field focus
+                ("text", contact),
+                ("sleep", 0.35),  # contact list filter
+                ("key", "enter"),
+            ])
             return f"Opened chat with {contact}"
         except Exception:
-            logger.exception("WhatsApp contact search failed")
+            logger.error("WhatsApp contact search failed", exc_info=_LOG_TB)
             return "Failed to search contact"
 
     # ==================== PUBLIC API ====================
@@ -708,20 +1100,32 @@ class AppController:
         app_name = app_name.lower()
         command = command.lower()
 
-        if app_name not in self.app_commands:
-            return f"App '{app_name}' not supported yet"
-
-        if command not in self.app_commands[app_name]:
+        func = self._dispatch.get((app_name, command))
+        if func is None:
+            if app_name not in self.app_commands:
+                return f"App '{app_name}' not supported yet"
             available = ", ".join(self.app_commands[app_name].keys())
             return f"Command '{command}' not available. Available: {available}"
 
+        # Run the UI automation off the voice thread: submit to the
+        # single worker (focus/typing must stay sequential) and ack
+        # immediately so the speech loop never blocks on sleeps
+        self._last_future = self._exec.submit(self._run_handler, func, params)
+        return f"Working on {command} for {app_name}..."
+
+    def _run_handler(self, func, params) -> str:
         try:
-            func = self.app_commands[app_name][command]
             return func(**params)
         except Exception as e:
-            logger.exception("Command execution failed: %s", e)
+            logger.error("Command execution failed: %s", e, exc_info=_LOG_TB)
             return f"Error executing command: {e}"
 
+    def await_last(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Block until the most recently submitted command finishes."""
+        if self._last_future is None:
+            return None
+        return self._last_future.result(timeout=timeout)
+
     def list_supported_apps(self) -> List[str]:
         return list(self.app_commands.keys())
 
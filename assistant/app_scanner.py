@@ -2,28 +2,105 @@ import json
 import logging
 import os
 import subprocess
+import tempfile
+import threading
 import winreg
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
-from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
+import numpy as np
 from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
 
 from assistant.config_manager import Config
 
 logger = logging.getLogger("AI_Assistant.AppScanner")
 
+_MISS = object()  # cache-miss sentinel (None is a legitimate cached result)
+
+
+def _iter_files(root: str):
+    """Recursive os.scandir walk yielding DirEntry objects for files.
+
+    DirEntry caches type info from the directory read itself, so unlike
+    pathlib.rglob this issues no extra stat() per entry and allocates no
+    Path objects on the hot path.
+    """
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                try:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from _iter_files(entry.path)
+                    elif entry.is_file():
+                        yield entry
+                except OSError:
+                    continue
+    except OSError:
+        return
+
 
 class AppManager:
     """Scans for and manages all detectable applications on the system."""
 
-    def __init__(self):
-        self.cache_file = Path(Config.CACHE_DIR) / "apps_cache.json"
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_file = (
+            Path(cache_path) if cache_path
+            else Path(Config.CACHE_DIR) / "apps_cache.json"
+        )
         self.cache_duration = timedelta(hours=24)
+        self._refresh_thread: Optional[threading.Thread] = None
+        # Per-instance LRU over normalized queries. lru_cache on the
+        # bound method kept self alive inside a class-wide cache and
+        # went silently stale across rescans; an OrderedDict cleared by
+        # _index_keys has neither problem.
+        self._match_cache: OrderedDict = OrderedDict()
         self.apps = self._load_apps_with_cache()
+        self._index_keys()
         logger.info(f"Initialized with {len(self.apps)} applications found.")
 
+    def _index_keys(self) -> None:
+        """Precomputes the normalized key corpus the fuzzy matcher scores.
+
+        default_process (lowercase, strip non-alphanumerics) otherwise
+        runs on every app name for every query; done once here, queries
+        only pay to normalize themselves.
+        """
+        self._match_cache.clear()
+        self._app_keys = list(self.apps.keys())
+        self._processed_keys = [default_process(k) for k in self._app_keys]
+        # 32-bit character-presence mask per key: a key can only score
+        # well if it contains (roughly) the query's characters, so one
+        # vectorized mask compare prunes most of the corpus before any
+        # Levenshtein work
+        masks = np.zeros(len(self._processed_keys), dtype=np.uint32)
+        for i, key in enumerate(self._processed_keys):
+            mask = 0
+            for c in key:
+                mask |= 1 << (ord(c) & 31)
+            masks[i] = mask
+        self._key_charmasks = masks
+        # Prefix index: voice queries like "chr" -> "chrome" resolve with
+        # one dict probe, so the fuzzy scorer only runs for the minority
+        # of queries the table can't answer unambiguously
+        by_prefix = defaultdict(list)
+        for i, key in enumerate(self._app_keys):
+            for ln in range(2, min(6, len(key)) + 1):
+                by_prefix[key[:ln]].append(i)
+        self._by_prefix = by_prefix
+
+    @staticmethod
+    def _charmask(text: str) -> int:
+        mask = 0
+        for c in text:
+            mask |= 1 << (ord(c) & 31)
+        return mask
+
     def rescan_apps(self) -> str:
         """Deletes the cache and rescans for all applications."""
         try:
@@ -31,6 +108,7 @@ class AppManager:
                 self.cache_file.unlink()
                 logger.info("Application cache deleted.")
             self.apps = self._load_apps_with_cache()
+            self._index_keys()
             return f"Successfully rescanned. I found {len(self.apps)} applications."
         except OSError as e:
             logger.error(f"Error deleting cache file: {e}")
@@ -48,33 +126,87 @@ class AppManager:
         return {}
 
     def _load_apps_with_cache(self) -> Dict[str, str]:
-        """Loads apps from cache or rescans, with robust error handling."""
+        """Loads apps from cache (even stale, refreshed in background) or rescans.
+
+        A stale cache is served immediately so construction never blocks
+        on the seconds-long disk/registry walk; a daemon thread rescans
+        and swaps in fresh data when ready. Only a missing or corrupt
+        cache (first run) pays for a synchronous scan.
+        """
         if self.cache_file.exists():
-            if (
-                datetime.now() - datetime.fromtimestamp(self.cache_file.stat().st_mtime)
-                < self.cache_duration
-            ):
-                try:
-                    with self.cache_file.open("r", encoding="utf-8") as f:
-                        return json.load(f)
-                except (json.JSONDecodeError, OSError):
-                    logger.warning("Cache file is corrupted, rebuilding...")
-                    self.cache_file.unlink(missing_ok=True)
+            try:
+                with self.cache_file.open("r", encoding="utf-8") as f:
+                    cached = json.load(f)
+                stale = (
+                    datetime.now() - datetime.fromtimestamp(self.cache_file.stat().st_mtime)
+                    >= self.cache_duration
+                )
+                if stale:
+                    self._start_background_refresh()
+                return cached
+            except (json.JSONDecodeError, OSError):
+                logger.warning("Cache file is corrupted, rebuilding...")
+                self.cache_file.unlink(missing_ok=True)
+
+        apps = self._scan_all()
+        self._write_cache(apps)
+        return apps
+
+    def _scan_all(self) -> Dict[str, str]:
+        """Runs all scanners concurrently and merges the results.
 
+        The scans are independent and I/O-bound (registry walk, Start
+        Menu filesystem walk, a ~1-2s PowerShell subprocess), so running
+        them on a thread pool overlaps their wall time. Results merge in
+        fixed priority order regardless of completion order: custom apps
+        last, so they win ties.
+        """
+        scans = (
+            self._scan_registry_apps,
+            self._scan_start_menu,
+            self._scan_store_apps,
+            self._load_custom_apps,
+        )
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            results = [f.result() for f in [ex.submit(fn) for fn in scans]]
         apps = {}
-        apps.update(self._scan_registry_apps())
-        apps.update(self._scan_start_menu())
-        apps.update(self._scan_store_apps())
-        apps.update(self._load_custom_apps())
+        for result in results:
+            apps.update(result)
+        return apps
 
+    def _write_cache(self, apps: Dict[str, str]) -> None:
+        """Atomically replaces the cache file (temp file + os.replace)."""
         try:
             self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with self.cache_file.open("w", encoding="utf-8") as f:
-                json.dump(apps, f, indent=4)
+            fd, tmp = tempfile.mkstemp(
+                dir=self.cache_file.parent, suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(apps, f, indent=4)
+                os.replace(tmp, self.cache_file)
+            except OSError:
+                os.unlink(tmp)
+                raise
         except OSError as e:
             logger.error(f"Error writing to cache file: {e}")
 
-        return apps
+    def _start_background_refresh(self) -> None:
+        """Rescans on a daemon thread and swaps in the fresh index."""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+
+        def refresh():
+            apps = self._scan_all()
+            self._write_cache(apps)
+            self.apps = apps  # atomic rebind; readers see old or new dict
+            self._index_keys()
+            logger.info(f"Background rescan finished: {len(apps)} applications.")
+
+        self._refresh_thread = threading.Thread(
+            target=refresh, name="AppScan", daemon=True
+        )
+        self._refresh_thread.start()
 
     def _scan_store_apps(self) -> Dict[str, str]:
         """Scans installed Microsoft Store (UWP) apps and normalizes their paths."""
@@ -116,29 +248,56 @@ class AppManager:
         for path in start_paths:
             if not path.exists():
                 continue
-            for item in path.rglob("*"):
-                if item.suffix.lower() == ".lnk":
-                    apps[item.stem.lower()] = str(item)
-                elif item.suffix.lower() == ".exe" and item.stem.lower() not in apps:
-                    apps[item.stem.lower()] = str(item)
+            for entry in _iter_files(str(path)):
+                name = entry.name
+                dot = name.rfind(".")
+                if dot <= 0:
+                    continue
+                ext = name[dot:].lower()
+                if ext == ".lnk":
+                    apps[name[:dot].lower()] = entry.path
+                elif ext == ".exe" and name[:dot].lower() not in apps:
+                    apps[name[:dot].lower()] = entry.path
         return apps
 
     def _scan_registry_apps(self) -> Dict[str, str]:
-        """Scans the registry for app paths and validates their existence."""
+        """Scans HKLM and HKCU App Paths in parallel for registered apps."""
+        hives = (winreg.HKEY_LOCAL_MACHINE, winreg.HKEY_CURRENT_USER)
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            results = ex.map(self._scan_registry_hive, hives)
+        apps = {}
+        for result in results:
+            apps.update(result)
+        return apps
+
+    def _scan_registry_hive(self, hive) -> Dict[str, str]:
+        """Walks one hive's App Paths keys and validates their targets."""
         apps = {}
         reg_paths = [
             r"SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths",
             r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\App Paths",
         ]
+        # Locals for the enumerate/open/query chain: attribute lookups
+        # add up across hundreds of subkeys
+        open_key = winreg.OpenKey
+        enum_key = winreg.EnumKey
+        query_info = winreg.QueryInfoKey
+        query_value = winreg.QueryValueEx
+        isfile = os.path.isfile
         for reg_path in reg_paths:
             try:
-                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path) as key:
-                    for i in range(winreg.QueryInfoKey(key)[0]):
+                with open_key(hive, reg_path) as key:
+                    for i in range(query_info(key)[0]):
                         try:
-                            subkey_name = winreg.EnumKey(key, i)
-                            with winreg.OpenKey(key, subkey_name) as subkey:
-                                path, _ = winreg.QueryValueEx(subkey, "")
-                                if path and Path(path).exists():
+                            subkey_name = enum_key(key, i)
+                            with open_key(key, subkey_name) as subkey:
+                                path, _ = query_value(subkey, "")
+                                if not path:
+                                    continue
+                                # URI targets have no file to stat;
+                                # isfile beats Path.exists elsewhere
+                                # (no Path object, one stat)
+                                if path.lower().startswith(("shell:", "ms-settings:")) or isfile(path):
                                     apps[Path(subkey_name).stem.lower()] = path
                         except OSError:
                             continue
@@ -146,18 +305,94 @@ class AppManager:
                 continue
         return apps
 
-    @lru_cache(maxsize=256)
     def find_best_match(self, query: str) -> Optional[str]:
-        """Finds the best application match using improved fuzzy logic."""
+        """Finds the best application match using improved fuzzy logic.
+
+        The cache keys on the stripped, lowercased query so trivial
+        variants ("Chrome", " chrome ") share one slot instead of each
+        busting the LRU.
+        """
+        q_norm = query.strip().lower()
+        cached = self._match_cache.get(q_norm, _MISS)
+        if cached is not _MISS:
+            self._match_cache.move_to_end(q_norm)
+            return cached
+        result = self._match(q_norm)
+        self._match_cache[q_norm] = result
+        if len(self._match_cache) > 1024:
+            self._match_cache.popitem(last=False)
+        return result
+
+    def _match(self, query: str) -> Optional[str]:
         if not self.apps:
             return None
         if query in self.apps:
             return query
 
-        scorer = fuzz.token_set_ratio
-        matches = process.extractOne(query, self.apps.keys(), scorer=scorer)
+        # Unambiguous prefix hit: skip the scorer entirely
+        hits = self._by_prefix.get(query)
+        if hits and len(hits) == 1:
+            return self._app_keys[hits[0]]
+
+        # WRatio is cheaper than token_set_ratio (fewer edit-distance
+        # passes) and score_cutoff lets rapidfuzz prune candidates whose
+        # upper bound is already below threshold instead of scoring them.
+        # Short queries keep the original relaxed threshold.
+        cutoff = 60 if len(query) <= 4 else 75
+        processed = default_process(query)
+
+        # Charmask prefilter: one vectorized compare keeps only keys
+        # containing every character class of the query, typically
+        # trimming the candidate set 5-20x before the scorer runs. An
+        # empty result falls back to the full corpus so unusual queries
+        # still get fuzzy treatment.
+        q_mask = np.uint32(self._charmask(processed))
+        candidates = np.nonzero(
+            (self._key_charmasks & q_mask) == q_mask
+        )[0]
+        if len(candidates):
+            choices = [self._processed_keys[i] for i in candidates]
+        else:
+            candidates = None
+            choices = self._processed_keys
+
+        match = process.extractOne(
+            processed,
+            choices,
+            scorer=fuzz.WRatio,
+            processor=None,
+            score_cutoff=cutoff,
+            score_hint=75,
+        )
 
-        if matches and (matches[1] > 75 or (len(query) <= 4 and matches[1] > 60)):
-            return matches[0]
+        if match:
+            idx = candidates[match[2]] if candidates is not None else match[2]
+            return self._app_keys[idx]
 
         return None
+
+    def find_best_matches(self, queries: List[str]) -> List[Optional[str]]:
+        """Matches a batch of queries in one vectorized cdist pass.
+
+        For multi-intent utterances this scores the whole query x app
+        matrix inside rapidfuzz's C++ kernels (workers=-1 spreads rows
+        across cores) instead of re-entering Python per query.
+        """
+        if not queries or not self.apps:
+            return [None] * len(queries)
+
+        scores = process.cdist(
+            [default_process(q) for q in queries],
+            self._processed_keys,
+            scorer=fuzz.WRatio,
+            processor=None,
+            score_cutoff=60,
+            workers=-1,
+            dtype=np.uint8,
+        )
+        best = scores.argmax(axis=1)
+        results = []
+        for query, idx, row in zip(queries, best, scores):
+            cutoff = 60 if len(query) <= 4 else 75
+            results.append(self._app_keys[idx] if row[idx] >= cutoff else None)
+        return results
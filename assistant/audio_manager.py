@@ -3,7 +3,6 @@ Audio Manager - Handles microphone input and speaker output
 """
 import numpy as np
 import sounddevice as sd
-import queue
 import threading
 from typing import Optional, Generator
 import sys
@@ -13,42 +12,69 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import SAMPLE_RATE, CHANNELS, CHUNK_SIZE
 
+# Ring capacity in chunks (~8s at 32ms/chunk): enough slack for a slow
+# consumer without unbounded growth
+RING_CHUNKS = 256
+
 
 class AudioManager:
     """Manages audio input/output streams"""
-    
+
     def __init__(self):
         self.sample_rate = SAMPLE_RATE
         self.channels = CHANNELS
         self.chunk_size = CHUNK_SIZE
-        self.audio_queue: queue.Queue = queue.Queue()
+        # Preallocated SPSC ring buffer: the audio callback writes rows
+        # and bumps _w, the consumer reads rows and bumps _r. Plain int
+        # stores are atomic under the GIL, so no mutex and no per-chunk
+        # allocation on the real-time thread (queue.Queue took a lock
+        # and allocated a bytes object per block).
+        self.audio_ring = np.zeros((RING_CHUNKS, CHUNK_SIZE), dtype=np.int16)
+        self._w = 0
+        self._r = 0
+        self._data_ready = threading.Event()
         self.is_recording = False
         self._stream: Optional[sd.InputStream] = None
-        
-    def _audio_callback(self, indata, frames, time, status):
-        """Callback for audio stream"""
-        if status:
-            print(f"Audio status: {status}")
-        if self.is_recording:
-            # Convert to int16 for compatibility
-            audio_data = (indata[:, 0] * 32767).astype(np.int16)
-            self.audio_queue.put(audio_data.tobytes())
-    
+
+    def _make_callback(self):
+        """Build the stream callback with hot attributes bound as locals.
+
+        Every self.X in the callback is a dict lookup on the real-time
+        audio thread, where worst-case latency matters more than average
+        cost. The ring and event methods are captured in the closure;
+        only the genuinely mutable state (is_recording, the write
+        cursor) still goes through self.
+        """
+        ring = self.audio_ring
+        ready_is_set = self._data_ready.is_set
+        ready_set = self._data_ready.set
+
+        def _audio_callback(indata, frames, time, status):
+            if status:
+                print(f"Audio status: {status}")
+            if self.is_recording:
+                ring[self._w % RING_CHUNKS, :frames] = indata[:, 0]
+                self._w += 1
+                if not ready_is_set():
+                    ready_set()
+
+        return _audio_callback
+
     def start_stream(self):
         """Start the audio input stream"""
         if self._stream is not None:
             return
-            
+
         self._stream = sd.InputStream(
             samplerate=self.sample_rate,
             channels=self.channels,
-            dtype=np.float32,
+            dtype=np.int16,
             blocksize=self.chunk_size,
-            callback=self._audio_callback
+            callback=self._make_callback()
         )
         self._stream.start()
         print("🎤 Audio stream started")
-    
+
     def stop_stream(self):
         """Stop the audio input stream"""
         if self._stream is not None:
@@ -56,49 +82,80 @@ class AudioManager:
             self._stream.close()
             self._stream = None
             print("🎤 Audio stream stopped")
-    
+
     def start_recording(self):
         """Start recording audio to queue"""
+        # Drop any old audio by catching the read cursor up
+        self._r = self._w
+        self._data_ready.clear()
         self.is_recording = True
-        # Clear any old audio
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-            except queue.Empty:
-                break
-    
+
     def stop_recording(self):
         """Stop recording audio"""
         self.is_recording = False
-    
+
     def get_audio_chunk(self, timeout: float = 0.1) -> Optional[bytes]:
-        """Get an audio chunk from the queue"""
-        try:
-            return self.audio_queue.get(timeout=timeout)
-        except queue.Empty:
-            return None
-    
+        """Get an audio chunk from the ring buffer"""
+        if self._r >= self._w:
+            self._data_ready.clear()
+            if self._r >= self._w and not self._data_ready.wait(timeout):
+                return None
+        if self._w - self._r >= RING_CHUNKS:
+            # Consumer fell a full ring behind; drop the overwritten tail.
+            # Clamp one slot past the oldest row: at exactly _w - RING_CHUNKS
+            # the read would land on the producer's next write row and could
+            # return a torn chunk mid-overwrite
+            self._r = self._w - RING_CHUNKS + 1
+        chunk = self.audio_ring[self._r % RING_CHUNKS].tobytes()
+        self._r += 1
+        return chunk
+
     def get_audio_stream(self) -> Generator[bytes, None, None]:
         """Generator that yields audio chunks"""
         while self.is_recording:
             chunk = self.get_audio_chunk()
             if chunk:
                 yield chunk
-    
+
     @staticmethod
     def play_audio(audio_data: np.ndarray, sample_rate: int = 24000):
         """Play audio through speakers"""
         sd.play(audio_data, sample_rate)
         sd.wait()
-    
+
+    @staticmethod
+    def _wav_data_offset(filepath: str) -> tuple:
+        """Locate the data chunk: returns (byte offset, byte size)"""
+        with open(filepath, 'rb') as f:
+            f.seek(12)  # past RIFF<size>WAVE
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise ValueError(f"No data chunk in {filepath}")
+                chunk_id = header[:4]
+                size = int.from_bytes(header[4:8], 'little')
+                if chunk_id == b'data':
+                    return f.tell(), size
+                f.seek(size + (size & 1), 1)  # chunks are word-aligned
+
     @staticmethod
     def play_file(filepath: str):
         """Play an audio file"""
         import wave
         with wave.open(filepath, 'rb') as wf:
-            data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
-            sd.play(data, wf.getframerate())
-            sd.wait()
+            framerate = wf.getframerate()
+            sampwidth = wf.getsampwidth()
+        if sampwidth == 2:
+            # Memory-map the sample region: playback streams from the
+            # page cache instead of copying the whole file into RAM
+            offset, size = AudioManager._wav_data_offset(filepath)
+            data = np.memmap(filepath, dtype=np.int16, mode='r',
+                             offset=offset, shape=(size // 2,))
+        else:
+            with wave.open(filepath, 'rb') as wf:
+                data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        sd.play(data, framerate)
+        sd.wait()
 
 
 # Test function
@@ -108,7 +165,7 @@ def test_audio():
     manager = AudioManager()
     manager.start_stream()
     manager.start_recording()
-    
+
     import time
     chunks = []
     start = time.time()
@@ -116,10 +173,10 @@ def test_audio():
         chunk = manager.get_audio_chunk()
         if chunk:
             chunks.append(chunk)
-    
+
     manager.stop_recording()
     manager.stop_stream()
-    
+
     total_bytes = sum(len(c) for c in chunks)
     print(f"✅ Recorded {len(chunks)} chunks, {total_bytes} bytes")
 
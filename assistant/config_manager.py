@@ -1,4 +1,5 @@
 import os
+import pickle
 import sys
 import yaml
 from pathlib import Path
@@ -10,6 +11,49 @@ logger = logging.getLogger("AI_Assistant.Config")
 
 load_dotenv()
 
+_TRUE = frozenset(("1", "true", "yes", "on"))
+
+
+def _envbool(name, default=""):
+    """Parses a boolean environment flag"""
+    return os.getenv(name, default).strip().lower() in _TRUE
+
+
+# libyaml's C loader parses an order of magnitude faster than the
+# pure-Python default; fall back when PyYAML was built without it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+def _load_yaml_cached(path):
+    """Parses a YAML file, memoized to a pickle sidecar keyed on mtime.
+
+    Unpickling a small settings dict takes microseconds where YAML
+    parsing takes milliseconds, so repeat startups skip the parse; the
+    sidecar rebuilds whenever the YAML is edited.
+    """
+    yaml_mtime = path.stat().st_mtime
+    pkl_path = path.with_suffix(path.suffix + ".pkl")
+    try:
+        with pkl_path.open("rb") as f:
+            cached_mtime, data = pickle.load(f)
+        if cached_mtime == yaml_mtime:
+            return data
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        pass
+
+    with path.open("r") as f:
+        data = yaml.load(f, Loader=_YamlLoader) or {}
+    try:
+        with pkl_path.open("wb") as f:
+            pickle.dump((yaml_mtime, data), f, pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        logger.warning(f"Could not cache parsed config {path.name}: {e}")
+    return data
+
+
 class Config:
     """Enhanced configuration class with better error handling and validation"""
 
@@ -32,12 +76,10 @@ class Config:
 
     try:
         if MODEL_REGISTRY_PATH.exists():
-            with open(MODEL_REGISTRY_PATH, "r") as f:
-                MODELS_CONFIG = yaml.safe_load(f) or {}
-                
+            MODELS_CONFIG = _load_yaml_cached(MODEL_REGISTRY_PATH)
+
         if SETTINGS_PATH.exists():
-            with open(SETTINGS_PATH, "r") as f:
-                SETTINGS_CONFIG = yaml.safe_load(f) or {}
+            SETTINGS_CONFIG = _load_yaml_cached(SETTINGS_PATH)
     except ImportError:
         logger.warning("⚠️ PyYAML not installed. Using defaults.")
     except Exception as e:
@@ -50,7 +92,7 @@ class Config:
     VOSK_MODEL_PATH = MODELS_DIR / "vosk-model-small-en-us-0.15"
 
     # ================== Core Configuration ==================
-    LOCAL_ONLY = bool(os.getenv("LOCAL_ONLY", "").lower() in {"1", "true", "yes"})
+    LOCAL_ONLY = _envbool("LOCAL_ONLY")
 
     # ================== API Keys & Credentials ==================
     OPENWEATHERMAP_API_KEY = os.getenv("OPENWEATHERMAP_API_KEY")
@@ -61,13 +103,13 @@ class Config:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
     # ================== Web Agent Configuration ==================
-    WEB_AGENT_ENABLED = bool(os.getenv("WEB_AGENT_ENABLED", "true").lower() in {"1", "true", "yes"})
+    WEB_AGENT_ENABLED = _envbool("WEB_AGENT_ENABLED", "true")
     WEB_AGENT_MODE = os.getenv("WEB_AGENT_MODE", "auto")
     WEB_AGENT_BROWSER = os.getenv("WEB_AGENT_BROWSER", "chromium")
-    WEB_AGENT_HEADLESS = bool(os.getenv("WEB_AGENT_HEADLESS", "true").lower() in {"1", "true", "yes"})
+    WEB_AGENT_HEADLESS = _envbool("WEB_AGENT_HEADLESS", "true")
     
     # ================== System Configuration ==================
-    GAMING_MODE = bool(os.getenv("GAMING_MODE", "false").lower() in {"1", "true", "yes"})
+    GAMING_MODE = _envbool("GAMING_MODE", "false")
     
     # ================== Helpers ==================
     @classmethod
@@ -2,13 +2,28 @@
 Conversation Memory - Persistent conversation history with SQLite backend
 """
 import sqlite3
-import json
+import itertools
 import os
 import threading
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
+# orjson serializes small dicts several times faster than stdlib json;
+# it returns bytes, which SQLite stores fine in the TEXT-affinity
+# metadata column. Falls back to stdlib when not installed.
+try:
+    import orjson
+
+    def _dump_metadata(metadata: Dict[str, Any]) -> bytes:
+        return orjson.dumps(metadata)
+except ImportError:
+    import json
+
+    def _dump_metadata(metadata: Dict[str, Any]) -> str:
+        return json.dumps(metadata)
+
 class ConversationMemory:
     """
     Persistent conversation memory that saves to SQLite database.
@@ -38,36 +53,66 @@ class ConversationMemory:
             except Exception as e:
                 print(f"   ⚠️ Could not create cache directory: {e}")
                 
-        self._init_db()
-        
-    def _get_connection(self) -> sqlite3.Connection:
-        """Get thread-safe DB connection"""
-        return sqlite3.connect(
-            str(self.db_path), 
+        # One persistent connection for the process lifetime: opening a
+        # connection per call cost more than the small inserts themselves,
+        # and WAL + synchronous=NORMAL turns each commit into one small
+        # append instead of a rollback-journal fsync pair. self._lock
+        # serializes access across threads.
+        self._conn = sqlite3.connect(
+            str(self.db_path),
             check_same_thread=False,
-            timeout=10.0
+            timeout=10.0,
         )
+        # In-memory mirror of the last max_messages rows: the chat loop
+        # calls get_recent before every LLM turn, and the data is already
+        # here from the last add - no SQL round-trip on the hot path
+        self._recent = deque(maxlen=max_messages)
+        self._init_db()
 
     def _init_db(self):
         """Initialize database schema"""
         with self._lock:
             try:
-                with self._get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS messages (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            role TEXT NOT NULL,
-                            content TEXT NOT NULL,
-                            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                            metadata TEXT
-                        )
-                    """)
-                    
-                    # Create index for faster retrieval
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON messages(timestamp)")
-                    
-                    conn.commit()
+                cursor = self._conn.cursor()
+                cursor.executescript("""
+                    PRAGMA journal_mode=WAL;
+                    PRAGMA synchronous=NORMAL;
+                    PRAGMA temp_store=MEMORY;
+                    PRAGMA cache_size=-8000;
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS messages (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        role TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        metadata TEXT
+                    )
+                """)
+
+                # idx_timestamp taxed every insert and nothing reads it
+                # now that retrieval scans the rowid tail
+                cursor.execute("DROP INDEX IF EXISTS idx_timestamp")
+
+                self._conn.commit()
+
+                cursor.execute(
+                    """
+                    SELECT role, content
+                    FROM (
+                        SELECT role, content, id
+                        FROM messages
+                        ORDER BY id DESC
+                        LIMIT ?
+                    )
+                    ORDER BY id ASC
+                    """,
+                    (self.max_messages,)
+                )
+                self._recent.extend(
+                    {"role": role, "content": content}
+                    for role, content in cursor.fetchall()
+                )
             except Exception as e:
                 print(f"   ⚠️ Memory DB Init Error: {e}")
 
@@ -75,73 +120,64 @@ class ConversationMemory:
         """Add a message to history"""
         with self._lock:
             try:
-                with self._get_connection() as conn:
-                    conn.execute(
-                        "INSERT INTO messages (role, content, timestamp, metadata) VALUES (?, ?, ?, ?)",
-                        (
-                            role, 
-                            content, 
-                            datetime.now(), 
-                            json.dumps(metadata) if metadata else None
-                        )
+                self._conn.execute(
+                    "INSERT INTO messages (role, content, timestamp, metadata) VALUES (?, ?, ?, ?)",
+                    (
+                        role,
+                        content,
+                        datetime.now(),
+                        _dump_metadata(metadata) if metadata else None
                     )
-                    conn.commit()
+                )
+                self._conn.commit()
+                self._recent.append({"role": role, "content": content})
             except Exception as e:
                 print(f"   ⚠️ Failed to save message: {e}")
 
     def add_exchange(self, user_msg: str, assistant_msg: str) -> None:
-        """Add user/assistant pair"""
-        self.add("user", user_msg)
-        self.add("assistant", assistant_msg)
+        """Add user/assistant pair in one transaction"""
+        now = datetime.now()
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT INTO messages (role, content, timestamp, metadata) VALUES (?, ?, ?, ?)",
+                    [
+                        ("user", user_msg, now, None),
+                        ("assistant", assistant_msg, now, None),
+                    ]
+                )
+                self._conn.commit()
+                self._recent.append({"role": "user", "content": user_msg})
+                self._recent.append({"role": "assistant", "content": assistant_msg})
+            except Exception as e:
+                print(f"   ⚠️ Failed to save exchange: {e}")
 
     def get_recent(self, n: int = None) -> List[Dict[str, str]]:
         """Get N most recent messages, ordered chronologically"""
         limit = n if n else self.max_messages
-        
-        try:
-            with self._get_connection() as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                # Get last N messages (need subquery to get correct order)
-                query = f"""
-                    SELECT role, content 
-                    FROM (
-                        SELECT role, content, timestamp 
-                        FROM messages 
-                        ORDER BY timestamp DESC 
-                        LIMIT ?
-                    ) 
-                    ORDER BY timestamp ASC
-                """
-                
-                cursor.execute(query, (limit,))
-                rows = cursor.fetchall()
-                
-                return [
-                    {"role": row["role"], "content": row["content"]} 
-                    for row in rows
-                ]
-        except Exception as e:
-            print(f"   ⚠️ Failed to retrieve memory: {e}")
-            return []
+
+        # Served from the in-memory mirror; SQLite is only the durable
+        # store. The deque caps at max_messages, which also bounded the
+        # old query's default limit.
+        with self._lock:
+            start = max(0, len(self._recent) - limit)
+            return list(itertools.islice(self._recent, start, None))
 
     def clear(self):
         """Clear all history"""
         with self._lock:
             try:
-                with self._get_connection() as conn:
-                    conn.execute("DELETE FROM messages")
-                    conn.commit()
+                self._conn.execute("DELETE FROM messages")
+                self._conn.commit()
+                self._recent.clear()
                 print("   🗑️ Conversation memory cleared (SQLite)")
             except Exception as e:
                 print(f"   ⚠️ Failed to clear memory: {e}")
                 
     def __len__(self) -> int:
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM messages")
+            with self._lock:
+                cursor = self._conn.execute("SELECT COUNT(*) FROM messages")
                 return cursor.fetchone()[0]
         except:
             return 0
@@ -18,7 +18,10 @@ class HealthMonitor:
     def __init__(self, check_interval: int = 5, timeout: int = 30):
         self.check_interval = check_interval
         self.timeout = timeout
-        self.last_heartbeat = time.time()
+        # Monotonic ns: immune to NTP wall-clock jumps, and the vDSO
+        # clock read is cheaper than time.time(). The int store is
+        # atomic under the GIL, so no lock around it.
+        self.last_heartbeat_ns = time.monotonic_ns()
         self.running = False
         self._monitor_thread = None
         self._crash_count = 0
@@ -26,21 +29,25 @@ class HealthMonitor:
     def start(self):
         """Start the monitoring thread"""
         self.running = True
-        self.last_heartbeat = time.time()
+        self.last_heartbeat_ns = time.monotonic_ns()
         self._monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self._monitor_thread.start()
         logger.info("   🩺 Health monitor started")
         
     def heartbeat(self):
         """Signal that the main loop is alive"""
-        self.last_heartbeat = time.time()
+        # Debounced to 100ms: tight loops may call this thousands of
+        # times a second, and the watchdog only checks every few seconds
+        now = time.monotonic_ns()
+        if now - self.last_heartbeat_ns > 100_000_000:
+            self.last_heartbeat_ns = now
         
     def _monitor_loop(self):
         """Watchdog loop"""
         while self.running:
             time.sleep(self.check_interval)
             
-            elapsed = time.time() - self.last_heartbeat
+            elapsed = (time.monotonic_ns() - self.last_heartbeat_ns) / 1e9
             if elapsed > self.timeout:
                 logger.warning(f"   ⚠️ System frozen? No heartbeat for {elapsed:.1f}s")
                 # In a more complex system, we might trigger a restart here
@@ -1,24 +1,47 @@
 """
 LLM Router - Handles local (Ollama) and online (Groq, Nvidia, OpenRouter, Gemini) models
 """
-import ollama
-from google import genai
-from groq import Groq
-from openai import OpenAI
+import asyncio
+import hashlib
+import re
+import httpx
 from typing import Optional, Generator, List, Dict
-import sys
-import os
+from collections import OrderedDict
+import threading
+import time
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import (
-    OLLAMA_MODEL, GEMINI_API_KEY, GEMINI_MODEL, GROQ_API_KEY,
+    OLLAMA_HOST, OLLAMA_MODEL, GEMINI_API_KEY, GEMINI_MODEL, GROQ_API_KEY,
     OPENROUTER_API_KEY, OPENROUTER_MODEL,
     NVIDIA_API_KEY, NVIDIA_MODEL,
     LMSTUDIO_HOST, LMSTUDIO_MODEL
 )
-from assistant.personality import SYSTEM_PROMPT
+from assistant.personality import SYSTEM_PROMPT, SYSTEM_MESSAGE
 from assistant.conversation_memory import ConversationMemory
 
+# Every provider call is bounded: voice replies are short (per
+# SYSTEM_PROMPT), and an uncapped request hanging for its full decode
+# starves the provider race
+LLM_TIMEOUT_S = 15
+LLM_MAX_RETRIES = 2
+LLM_MAX_TOKENS = 256
+
+# Answers to these change between asks, so they must never be served
+# from the response cache
+_VOLATILE_RE = re.compile(
+    r"\b(time|date|today|tomorrow|now|weather|news|remind)\b", re.IGNORECASE)
+RESPONSE_CACHE_SIZE = 256
+
+# Turns kept verbatim in the context window; anything older is folded
+# into a one-shot summary (4 turns = 8 messages)
+VERBATIM_MSGS = 8
+
+# Local-backend probe results expire: a healthy verdict lasts a minute,
+# a failure cools off for half that so a restarted server is picked up
+# without anyone flipping a flag
+HEALTH_OK_TTL_S = 60.0
+HEALTH_FAIL_TTL_S = 30.0
+
 
 class LLMRouter:
     """Routes between multiple LLM providers with fallback logic"""
@@ -27,24 +50,70 @@ class LLMRouter:
         self.prefer_local = prefer_local
         self.max_history = 10
         self.memory = ConversationMemory(max_messages=self.max_history * 2) # Keep slightly more in history
-        self._ollama_available: Optional[bool] = None
         self._ollama_model_name = OLLAMA_MODEL
+        # verdict + monotonic expiry per local backend; None = never probed
+        self._health = {"ollama": (None, 0.0), "lmstudio": (None, 0.0)}
+
+        # Built once and shared by every request: servers with prompt/KV
+        # caching (Ollama, LM Studio, vLLM-style backends) only reuse
+        # cached prefill when the prefix is byte-identical across calls,
+        # so the stable part of the prompt must never be rebuilt or
+        # mutated per call
+        self._stable_prefix_messages = [SYSTEM_MESSAGE]
+
+        # One pooled transport shared by every OpenAI-compatible client:
+        # per-client pools re-handshook TCP+TLS (~100-300ms) whenever a
+        # fallback provider was cold
+        self._http = httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            timeout=httpx.Timeout(connect=5, read=30, write=10, pool=5),
+        )
+        # Persistent Ollama client: module-level ollama.chat/list open a
+        # fresh connection per call. Shared with SkillRouter. The SDK
+        # imports live at first use, not module scope: together they pull
+        # in pydantic and friends (~1s), paid even for providers that
+        # are never configured.
+        import ollama
+        self.ollama_client = ollama.Client(host=OLLAMA_HOST)
         
-        # Clients
-        self._gemini_client: Optional[genai.Client] = None
-        self._groq_client: Optional[Groq] = None
-        self._openrouter_client: Optional[OpenAI] = None
-        self._nvidia_client: Optional[OpenAI] = None
-        self._lmstudio_client: Optional[OpenAI] = None
-        self._lmstudio_available: Optional[bool] = None
+        # Clients (SDK types; untyped to keep their imports lazy)
+        self._gemini_client = None
+        self._groq_client = None
+        self._openrouter_client = None
+        self._nvidia_client = None
+        self._lmstudio_client = None
+
+        # Repeated questions ("what can you do") short-circuit here: the
+        # key digests the prompt plus recent history, so a cached answer
+        # is only reused in the same conversational context
+        self._response_cache: OrderedDict = OrderedDict()
+
+        # Rolling summary of turns older than VERBATIM_MSGS; refreshed
+        # only when the older window changes, so it costs one cheap
+        # local call per turn at most
+        self._history_summary = ""
+        self._summarized_upto = None
+        self._summary_lock = threading.Lock()
+
+        # Warm the probes off-thread so the first chat doesn't pay for
+        # a connection attempt against a backend that may be down
+        for probe in (self._check_ollama, self._check_lmstudio):
+            threading.Thread(target=probe, daemon=True).start()
         
     def _check_ollama(self) -> bool:
-        """Check if Ollama is available and find best model"""
-        if self._ollama_available is not None:
-            return self._ollama_available
-        
+        """Check if Ollama is available (cached with a TTL)"""
+        ok, expires_at = self._health["ollama"]
+        if ok is not None and time.monotonic() < expires_at:
+            return ok
+        ok = self._probe_ollama()
+        ttl = HEALTH_OK_TTL_S if ok else HEALTH_FAIL_TTL_S
+        self._health["ollama"] = (ok, time.monotonic() + ttl)
+        return ok
+
+    def _probe_ollama(self) -> bool:
+        """Probe the Ollama server and find the best model"""
         try:
-            response = ollama.list()
+            response = self.ollama_client.list()
             available_models = []
             
             # Helper to get name
@@ -65,7 +134,6 @@ class LLMRouter:
                 # Ensure we use the exact model name found (e.g., 'llama3.2:3b' instead of 'llama3.2')
                 match = next((m for m in available_models if self._ollama_model_name in m), self._ollama_model_name)
                 self._ollama_model_name = match
-                self._ollama_available = True
                 return True
             
             fallbacks = ["phi3", "mistral", "llama3", "gemma", "qwen", "tinyllama"]
@@ -74,199 +142,396 @@ class LLMRouter:
                 if match:
                     print(f"   ⚠️ '{self._ollama_model_name}' not found, switching to '{match}'")
                     self._ollama_model_name = match
-                    self._ollama_available = True
                     return True
             
             if available_models:
                  self._ollama_model_name = available_models[0]
-                 self._ollama_available = True
                  return True
 
-            self._ollama_available = False
             return False
             
         except Exception as e:
             print(f"   ⚠️ Ollama check failed: {e}")
-            self._ollama_available = False
             return False
 
     def _check_lmstudio(self) -> bool:
-        """Check if LM Studio is available"""
-        if self._lmstudio_available is not None:
-            return self._lmstudio_available
-        
+        """Check if LM Studio is available (cached with a TTL)"""
+        ok, expires_at = self._health["lmstudio"]
+        if ok is not None and time.monotonic() < expires_at:
+            return ok
+        ok = self._probe_lmstudio()
+        ttl = HEALTH_OK_TTL_S if ok else HEALTH_FAIL_TTL_S
+        self._health["lmstudio"] = (ok, time.monotonic() + ttl)
+        return ok
+
+    def _probe_lmstudio(self) -> bool:
+        """Probe the LM Studio server"""
         try:
             # Initialize LM Studio client
+            from openai import OpenAI
             self._lmstudio_client = OpenAI(
                 base_url=LMSTUDIO_HOST,
-                api_key="lm-studio"  # LM Studio doesn't require a real key
+                api_key="lm-studio",  # LM Studio doesn't require a real key
+                http_client=self._http,
+                timeout=LLM_TIMEOUT_S,
+                max_retries=LLM_MAX_RETRIES
             )
             # Test connection by listing models
             models = self._lmstudio_client.models.list()
             if models.data:
                 model_names = [m.id for m in models.data]
                 print(f"   ✅ LM Studio available. Models: {model_names}")
-                self._lmstudio_available = True
                 return True
-            self._lmstudio_available = False
             return False
         except Exception as e:
             print(f"   ⚠️ LM Studio not available: {e}")
-            self._lmstudio_available = False
             return False
             
     def _configure_online(self):
         """Lazy load online clients"""
         if not self._groq_client and GROQ_API_KEY:
             try:
-                self._groq_client = Groq(api_key=GROQ_API_KEY)
+                from groq import Groq
+                self._groq_client = Groq(api_key=GROQ_API_KEY, http_client=self._http,
+                                         timeout=LLM_TIMEOUT_S, max_retries=LLM_MAX_RETRIES)
             except Exception as e: print(f"⚠️ Groq Init: {e}")
 
         if not self._nvidia_client and NVIDIA_API_KEY:
             try:
+                from openai import OpenAI
                 self._nvidia_client = OpenAI(
                     base_url="https://integrate.api.nvidia.com/v1",
-                    api_key=NVIDIA_API_KEY
+                    api_key=NVIDIA_API_KEY,
+                    http_client=self._http,
+                    timeout=LLM_TIMEOUT_S,
+                    max_retries=LLM_MAX_RETRIES
                 )
             except Exception as e: print(f"⚠️ Nvidia Init: {e}")
 
         if not self._openrouter_client and OPENROUTER_API_KEY:
             try:
+                from openai import OpenAI
                 self._openrouter_client = OpenAI(
                     base_url="https://openrouter.ai/api/v1",
-                    api_key=OPENROUTER_API_KEY
+                    api_key=OPENROUTER_API_KEY,
+                    http_client=self._http,
+                    timeout=LLM_TIMEOUT_S,
+                    max_retries=LLM_MAX_RETRIES
                 )
             except Exception as e: print(f"⚠️ OpenRouter Init: {e}")
 
         if not self._gemini_client and GEMINI_API_KEY:
             try:
+                from google import genai
                 self._gemini_client = genai.Client(api_key=GEMINI_API_KEY)
             except Exception as e: print(f"⚠️ Gemini Init: {e}")
 
     def _build_messages(self, user_message: str) -> List[Dict[str, str]]:
-        """Build message list with conversation history"""
-        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-        # Load history from memory
-        for msg in self.memory.get_recent(self.max_history):
-            messages.append(msg)
-        
+        """Build message list: summary of old turns + recent verbatim.
+
+        Prompt tokens are decoded linearly, so shipping ten full turns
+        every call slowed prefill and crowded the window. Older turns
+        collapse into a short summary; the last four stay verbatim.
+        """
+        messages = list(self._stable_prefix_messages)
+        history = self.memory.get_recent(self.max_history)
+        if len(history) > VERBATIM_MSGS:
+            summary = self._summarize_older(history[:-VERBATIM_MSGS])
+            if summary:
+                messages.append(
+                    {"role": "system", "content": f"Earlier context: {summary}"})
+                history = history[-VERBATIM_MSGS:]
+            # else: summarizer unavailable, keep full history verbatim
+        messages.extend(history)
         messages.append({"role": "user", "content": user_message})
         return messages
+
+    def _summarize_older(self, older: List[Dict[str, str]]) -> str:
+        """Fold messages older than the verbatim window into a summary"""
+        # Racing provider threads all build messages; only the first
+        # refreshes the summary, the rest reuse it
+        marker = (len(older), older[-1]["content"])
+        with self._summary_lock:
+            if marker == self._summarized_upto:
+                return self._history_summary
+            if not self._check_ollama():
+                return self._history_summary
+            transcript = "\n".join(
+                f"{m['role']}: {m['content']}" for m in older)
+            try:
+                response = self.ollama_client.chat(
+                    model=self._ollama_model_name,
+                    messages=[{
+                        "role": "user",
+                        "content": "Summarize this conversation in at most "
+                                   "3 short sentences, keeping names and "
+                                   f"decisions:\n{transcript}"
+                    }],
+                    options={"num_predict": 80},
+                )
+                self._history_summary = response['message']['content'].strip()
+                self._summarized_upto = marker
+            except Exception as e:
+                print(f"   ⚠️ History summary: {e}")
+            return self._history_summary
     
+    # Online providers wait this long before firing, so a healthy local
+    # model wins the race without its failures gating the remotes
+    LOCAL_HEAD_START_S = 0.2
+
+    def _cache_key(self, user_message: str) -> str:
+        """Digest of prompt + recent context + message (16 bytes)"""
+        h = hashlib.blake2b(SYSTEM_PROMPT.encode(), digest_size=16)
+        for msg in self.memory.get_recent(4):
+            h.update(msg["content"].encode())
+        h.update(user_message.encode())
+        return h.hexdigest()
+
     def chat(self, user_message: str) -> str:
         """Route message through available providers"""
-        response = None
-        self._configure_online()
-        
-        # 1. Ollama (Local - Speed/Primary)
-        if self.prefer_local and self._check_ollama():
-            response = self._chat_ollama(user_message)
-        
-        # 2. LM Studio (Local - Reasoning/Fallback)
-        if response is None and self.prefer_local and self._check_lmstudio():
-            response = self._chat_lmstudio(user_message)
-        
-        # 2. Groq (Speed)
-        if response is None:
-            response = self._chat_groq(user_message)
+        cacheable = not _VOLATILE_RE.search(user_message)
+        key = self._cache_key(user_message) if cacheable else None
+        if key is not None:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                self._response_cache.move_to_end(key)
+                self.memory.add_exchange(user_message, cached)
+                return cached
 
-        # 3. Nvidia (Power)
-        if response is None:
-            response = self._chat_nvidia(user_message)
-
-        # 4. OpenRouter (Flexibility)
-        if response is None:
-            response = self._chat_openrouter(user_message)
+        self._configure_online()
+        response = asyncio.run(self._race_providers(user_message))
 
-        # 5. Gemini (Context/Safety)
-        if response is None:
-            response = self._chat_gemini(user_message)
-        
         # Final Failure
         if response is None:
             return "All my brain connections are down. Please check your internet and API keys."
-        
+
+        if key is not None:
+            self._response_cache[key] = response
+            while len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+
         # Update history (Persisted)
         self.memory.add_exchange(user_message, response)
         return response
-    
-    def _chat_lmstudio(self, user_message: str) -> Optional[str]:
-        """Chat with LM Studio (OpenAI-compatible API)"""
-        if not self._lmstudio_client:
-            return None
+
+    def chat_stream(self, user_message: str) -> Generator[str, None, None]:
+        """Yield sentence-sized response chunks as tokens arrive.
+
+        Non-streaming chat() returns only after the full completion, so
+        first audible word lagged by the whole decode (seconds). Here
+        tokens buffer until a sentence boundary and each sentence is
+        yielded immediately, letting TTS speak the first one while the
+        rest is still decoding. History is saved once at the end.
+        """
+        self._configure_online()
+
+        token_iter = None
+        if self.prefer_local and self._check_ollama():
+            token_iter = self._stream_ollama(user_message)
+        elif self.prefer_local and self._check_lmstudio():
+            token_iter = self._stream_openai_compatible(
+                self._lmstudio_client, LMSTUDIO_MODEL, "LM Studio", user_message)
+        elif self._groq_client:
+            token_iter = self._stream_openai_compatible(
+                self._groq_client, "llama-3.1-8b-instant", "Groq", user_message)
+        elif self._nvidia_client:
+            token_iter = self._stream_openai_compatible(
+                self._nvidia_client, NVIDIA_MODEL, "Nvidia", user_message)
+        elif self._openrouter_client:
+            token_iter = self._stream_openai_compatible(
+                self._openrouter_client, OPENROUTER_MODEL, "OpenRouter",
+                user_message,
+                extra_headers={"HTTP-Referer": "https://github.com/buddy-assistant"})
+
+        if token_iter is None:
+            # Gemini/no provider: fall back to the racing path (which
+            # also handles history)
+            yield self.chat(user_message)
+            return
+
+        parts = []
+        buf = ""
+        for delta in token_iter:
+            if not delta:
+                continue
+            buf += delta
+            # Flush on sentence boundaries so TTS gets speakable units,
+            # not syllable-sized fragments
+            if buf.rstrip().endswith((".", "!", "?")) or "\n" in buf:
+                parts.append(buf)
+                yield buf
+                buf = ""
+        if buf:
+            parts.append(buf)
+            yield buf
+
+        full = "".join(parts)
+        if full:
+            self.memory.add_exchange(user_message, full)
+        else:
+            # Stream died before the first token; race the rest
+            yield self.chat(user_message)
+
+    def _stream_ollama(self, user_message: str) -> Generator[str, None, None]:
         try:
-            messages = self._build_messages(user_message)
-            completion = self._lmstudio_client.chat.completions.create(
-                model=LMSTUDIO_MODEL,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=1024
+            stream = self.ollama_client.chat(
+                model=self._ollama_model_name,
+                messages=self._build_messages(user_message),
+                stream=True,
+                options={"num_predict": LLM_MAX_TOKENS},
             )
-            return completion.choices[0].message.content
+            for part in stream:
+                yield part['message']['content']
         except Exception as e:
-            print(f"   ⚠️ LM Studio: {e}")
-            self._lmstudio_available = False
-            return None
-    
-    def _chat_ollama(self, user_message: str) -> Optional[str]:
+            print(f"   ⚠️ Ollama stream: {e}")
+
+    def _stream_openai_compatible(self, client, model, name, user_message,
+                                  **extra) -> Generator[str, None, None]:
         try:
-            messages = self._build_messages(user_message)
-            response = ollama.chat(model=self._ollama_model_name, messages=messages)
-            return response['message']['content']
+            completion = client.chat.completions.create(
+                model=model,
+                messages=self._build_messages(user_message),
+                temperature=0.7,
+                max_tokens=LLM_MAX_TOKENS,
+                stream=True,
+                **extra,
+            )
+            for chunk in completion:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
         except Exception as e:
-            print(f"   ⚠️ Ollama: {e}")
-            self._ollama_available = False
+            print(f"   ⚠️ {name} stream: {e}")
+
+    async def _race_providers(self, user_message: str) -> Optional[str]:
+        """Race all configured providers; first non-None answer wins.
+
+        The old serial fallback chain summed timeouts: one hung provider
+        stalled every one behind it. Here each provider runs on its own
+        worker task and the rest are cancelled as soon as one answers,
+        so worst-case latency is the fastest healthy backend plus the
+        local head start.
+        """
+        providers = []  # (delay, callable)
+        if self.prefer_local and self._check_ollama():
+            providers.append((0.0, self._chat_ollama))
+        if self.prefer_local and self._check_lmstudio():
+            providers.append((0.0, self._chat_lmstudio))
+        remote_delay = self.LOCAL_HEAD_START_S if providers else 0.0
+        for client, fn in (
+            (self._groq_client, self._chat_groq),
+            (self._nvidia_client, self._chat_nvidia),
+            (self._openrouter_client, self._chat_openrouter),
+            (self._gemini_client, self._chat_gemini),
+        ):
+            if client:
+                providers.append((remote_delay, fn))
+        if not providers:
             return None
 
-    def _chat_groq(self, user_message: str) -> Optional[str]:
-        if not self._groq_client: return None
+        async def attempt(delay, fn):
+            if delay:
+                await asyncio.sleep(delay)
+            # _chat_* swallow their own exceptions and return None
+            return await asyncio.to_thread(fn, user_message)
+
+        tasks = [
+            asyncio.create_task(attempt(delay, fn))
+            for delay, fn in providers
+        ]
         try:
-            messages = self._build_messages(user_message)
-            completion = self._groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=messages, temperature=0.7, max_tokens=1024
-            )
-            return completion.choices[0].message.content
-        except Exception as e:
-            print(f"   ⚠️ Groq: {e}")
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    result = task.result()
+                    if result:
+                        return result
             return None
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def _chat_openai_compatible(self, client, model: str, name: str,
+                                user_message: str, **extra) -> Optional[str]:
+        """Shared non-streaming path for every OpenAI-style backend.
 
-    def _chat_nvidia(self, user_message: str) -> Optional[str]:
-        if not self._nvidia_client: return None
+        The four provider methods were byte-for-byte clones apart from
+        client, model and error label; one body means one place for
+        request parameters and error handling.
+        """
+        if not client:
+            return None
         try:
-            messages = self._build_messages(user_message)
-            completion = self._nvidia_client.chat.completions.create(
-                model=NVIDIA_MODEL,
-                messages=messages, temperature=0.7, max_tokens=1024
+            completion = client.chat.completions.create(
+                model=model,
+                messages=self._build_messages(user_message),
+                temperature=0.7,
+                max_tokens=LLM_MAX_TOKENS,
+                **extra,
             )
             return completion.choices[0].message.content
         except Exception as e:
-            print(f"   ⚠️ Nvidia: {e}")
+            print(f"   ⚠️ {name}: {e}")
             return None
 
-    def _chat_openrouter(self, user_message: str) -> Optional[str]:
-        if not self._openrouter_client: return None
+    def _chat_lmstudio(self, user_message: str) -> Optional[str]:
+        result = self._chat_openai_compatible(
+            self._lmstudio_client, LMSTUDIO_MODEL, "LM Studio", user_message)
+        if result is None and self._lmstudio_client:
+            # Cool-off, not a permanent verdict
+            self._health["lmstudio"] = (False, time.monotonic() + HEALTH_FAIL_TTL_S)
+        return result
+
+    def _chat_ollama(self, user_message: str) -> Optional[str]:
         try:
             messages = self._build_messages(user_message)
-            completion = self._openrouter_client.chat.completions.create(
-                model=OPENROUTER_MODEL,
-                messages=messages,
-                extra_headers={"HTTP-Referer": "https://github.com/buddy-assistant"},
+            response = self.ollama_client.chat(
+                model=self._ollama_model_name, messages=messages,
+                options={"num_predict": LLM_MAX_TOKENS}
             )
-            return completion.choices[0].message.content
+            return response['message']['content']
         except Exception as e:
-            print(f"   ⚠️ OpenRouter: {e}")
+            print(f"   ⚠️ Ollama: {e}")
+            # Cool-off, not a permanent verdict
+            self._health["ollama"] = (False, time.monotonic() + HEALTH_FAIL_TTL_S)
             return None
 
+    def _chat_groq(self, user_message: str) -> Optional[str]:
+        return self._chat_openai_compatible(
+            self._groq_client, "llama-3.1-8b-instant", "Groq", user_message)
+
+    def _chat_nvidia(self, user_message: str) -> Optional[str]:
+        return self._chat_openai_compatible(
+            self._nvidia_client, NVIDIA_MODEL, "Nvidia", user_message)
+
+    def _chat_openrouter(self, user_message: str) -> Optional[str]:
+        return self._chat_openai_compatible(
+            self._openrouter_client, OPENROUTER_MODEL, "OpenRouter",
+            user_message,
+            extra_headers={"HTTP-Referer": "https://github.com/buddy-assistant"})
+
     def _chat_gemini(self, user_message: str) -> Optional[str]:
         if not self._gemini_client: return None
         try:
-            # Reconstruct history from memory for Gemini
-            history_text = self.memory.get_summary_context()
-            
-            full_prompt = f"{SYSTEM_PROMPT}\n\nPrevious conversation:\n{history_text}\n\nUser: {user_message}\nAssistant:"
+            from google import genai
+            # Structured turns instead of one interpolated prompt string:
+            # the system instruction stays byte-identical across calls,
+            # which lets the API's implicit prompt caching kick in
+            contents = [
+                {"role": "model" if m["role"] == "assistant" else "user",
+                 "parts": [{"text": m["content"]}]}
+                for m in self.memory.get_recent(self.max_history)
+            ]
+            contents.append({"role": "user", "parts": [{"text": user_message}]})
             response = self._gemini_client.models.generate_content(
-                model=GEMINI_MODEL, contents=full_prompt
+                model=GEMINI_MODEL, contents=contents,
+                config=genai.types.GenerateContentConfig(
+                    system_instruction=SYSTEM_PROMPT,
+                    max_output_tokens=LLM_MAX_TOKENS
+                )
             )
             return response.text
         except Exception as e:
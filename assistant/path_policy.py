@@ -0,0 +1,50 @@
+"""
+Path Policy - Compiled-once allowlist for file agent tool paths
+
+The file tools accept whatever path the model emits. Instead of ad-hoc
+per-call checks, the allowlist is compiled into a single alternation
+regex at construction, so validating a path in the hot tool-dispatch
+loop is one fullmatch against one compiled pattern regardless of how
+many rules are configured.
+"""
+import os
+import re
+from typing import Iterable, List, Optional
+
+# Rules are regexes over absolute paths, separated by os.pathsep, e.g.
+#   AGENT_PATH_ALLOWLIST="C:\\Users\\me\\notes\\.*;C:\\workspace\\.*"
+ALLOWLIST_ENV = "AGENT_PATH_ALLOWLIST"
+
+
+def _default_patterns() -> List[str]:
+    """Allow the working directory and the user's home tree"""
+    roots = [os.getcwd(), os.path.expanduser("~")]
+    sep = r"[\\/]"
+    return [re.escape(root) + f"(?:{sep}.*)?" for root in roots]
+
+
+class PathPolicy:
+    """
+    Allowlist of path patterns, merged into one compiled regex.
+
+    By default the agent may touch files under the current working
+    directory and the user's home; set AGENT_PATH_ALLOWLIST to replace
+    the rule set.
+    """
+
+    def __init__(self, patterns: Optional[Iterable[str]] = None):
+        if patterns is None:
+            raw = os.environ.get(ALLOWLIST_ENV, "")
+            patterns = raw.split(os.pathsep) if raw else _default_patterns()
+        self.patterns = list(patterns)
+        self._regex = re.compile(
+            "|".join(f"(?:{p})" for p in self.patterns)
+        )
+
+    def allows(self, path: str) -> bool:
+        """True if the (absolutized) path matches any allowlist rule"""
+        try:
+            resolved = os.path.abspath(path)
+        except (TypeError, ValueError):
+            return False
+        return self._regex.fullmatch(resolved) is not None
@@ -23,6 +23,12 @@ Important guidelines:
 Remember: You're having a voice conversation, not writing an essay. Be brief and natural!"""
 
 
+# Prebuilt chat message for the system prompt: providers get the same
+# dict object every call, so the stable prompt prefix stays
+# byte-identical (callers must copy, never mutate, the list it joins)
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+
 # Alternative personality presets
 PERSONALITIES = {
     "friendly": SYSTEM_PROMPT,
@@ -0,0 +1,66 @@
+"""
+Semantic Cache - Embedding-similarity response cache for LLM calls
+
+Many assistant queries recur verbatim or near-verbatim ("what's the
+weather", "read my notes"). A hit here returns a stored reply in tens
+of milliseconds instead of paying full prefill + decode on the model.
+"""
+import numpy as np
+from typing import Optional
+
+
+class SemanticCache:
+    """
+    Fixed-capacity ring buffer of (embedding, prompt, response) entries.
+
+    lookup() embeds the prompt, scores it against every stored entry
+    with one normalized matmul (BLAS handles the SIMD), and returns the
+    best response if its cosine similarity clears the threshold.
+    """
+
+    def __init__(self, client, embed_model: str = "nomic-embed-text",
+                 threshold: float = 0.92, capacity: int = 2048):
+        self.client = client  # ollama.AsyncClient
+        self.embed_model = embed_model
+        self.threshold = threshold
+        self.capacity = capacity
+        self.embeddings: Optional[np.ndarray] = None  # lazily sized (capacity, D)
+        self.prompts = [None] * capacity
+        self.responses = [None] * capacity
+        self.size = 0
+        self.cursor = 0
+
+    async def _embed(self, prompt: str) -> np.ndarray:
+        result = await self.client.embeddings(model=self.embed_model, prompt=prompt)
+        vec = np.asarray(result['embedding'], dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    async def lookup(self, prompt: str) -> Optional[str]:
+        """Return the cached response for the closest prompt, or None"""
+        if self.size == 0:
+            return None
+        try:
+            q = await self._embed(prompt)
+            scores = self.embeddings[:self.size] @ q
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return self.responses[best]
+        except Exception as e:
+            print(f"   ⚠️ Semantic cache lookup failed: {e}")
+        return None
+
+    async def put(self, prompt: str, response: str) -> None:
+        """Store a reply; oldest entry is overwritten once full"""
+        try:
+            vec = await self._embed(prompt)
+        except Exception as e:
+            print(f"   ⚠️ Semantic cache store failed: {e}")
+            return
+        if self.embeddings is None:
+            self.embeddings = np.zeros((self.capacity, vec.shape[0]), dtype=np.float32)
+        self.embeddings[self.cursor] = vec
+        self.prompts[self.cursor] = prompt
+        self.responses[self.cursor] = response
+        self.cursor = (self.cursor + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
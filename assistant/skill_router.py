@@ -2,26 +2,37 @@
 Skill Router - Hybrid keyword + LLM intent classification
 """
 import os
-import sys
+import re
+import json
 import importlib.util
+import inspect
 import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Union
+import numpy as np
 import ollama
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import OLLAMA_HOST
 from skills.base_skill import BaseSkill
 from assistant.skill_response import SkillResponse
 
 
+# Cosine similarity a query must reach against the closest skill
+# description before the embedding classifier trusts the match
+EMBED_SIM_THRESHOLD = 0.55
+
+
 class SkillRouter:
     """
     Routes user input to appropriate skills using hybrid approach:
     1. Fast keyword matching (~1ms)
-    2. LLM classification for ambiguous queries (~150ms)
+    2. Embedding similarity against skill descriptions (~10ms)
+    3. Generative LLM classification as a fallback (~150ms)
     """
     
-    def __init__(self, llm_router=None, tts=None, skills_dir: str = None):
+    def __init__(self, llm_router=None, tts=None, skills_dir: str = None,
+                 ollama_client=None):
         self.skills: Dict[str, BaseSkill] = {}
         self.skills_dir = skills_dir or os.path.join(
             os.path.dirname(os.path.dirname(__file__)), "skills"
@@ -29,76 +40,174 @@ class SkillRouter:
         self.llm = llm_router
         self.tts = tts
         self._classifier_model = "gemma:2b"  # Fast, small model for classification
+        # Reuse the router's pooled Ollama connection rather than the
+        # module-level ollama.chat, which reconnects per call
+        self._ollama = ollama_client or getattr(llm_router, "ollama_client", None) \
+            or ollama.Client(host=OLLAMA_HOST)
+        # Built by load_skills: one compiled alternation over every
+        # skill keyword plus a keyword->skill lookup
+        self._kw_regex: Optional[re.Pattern] = None
+        self._kw_to_skill: Dict[str, BaseSkill] = {}
+        self._no_keyword_skills: List[BaseSkill] = []
+        # Unit-norm rows of embedded skill descriptions; classification
+        # is then one matrix-vector product instead of a generative call
+        self._embed_model = "nomic-embed-text"
+        self._skill_embs: Optional[np.ndarray] = None
+        self._emb_names: List[str] = []
+        # Static halves of the generative classifier prompt, built once
+        # after load_skills; per-utterance cost is two concatenations
+        self._classifier_prefix = ""
+        self._classifier_suffix = '"'
         
+    # Modules whose skill class the generic scan used to miss
+    _EXPLICIT_SKILL_CLASSES = {
+        "reminder_skill": "ReminderSkill",
+        "clipboard_skill": "ClipboardSkill",
+        "calendar_skill": "CalendarSkill",
+        "vision_skill": "VisionSkill",
+        "mcp_skill": "MCPSkill",
+    }
+
     def load_skills(self):
-        """Dynamically load all skills from skills directory"""
+        """Load all skills from the skills directory in parallel.
+
+        Serial imports summed every module's import time (each skill
+        pulls its own dependencies); a small thread pool overlaps the
+        disk reads and compiles. Registration stays in listing order so
+        keyword precedence is unchanged.
+        """
         print("📦 Loading skills...")
-        
-        for filename in os.listdir(self.skills_dir):
-            if not filename.endswith("_skill.py"):
-                continue
-            if filename == "base_skill.py":
+
+        entries = [
+            (filename[:-3], os.path.join(self.skills_dir, filename))
+            for filename in sorted(os.listdir(self.skills_dir))
+            if filename.endswith("_skill.py") and filename != "base_skill.py"
+        ]
+        if not entries:
+            print("   Total skills: 0")
+            return
+
+        with ThreadPoolExecutor(max_workers=min(8, len(entries))) as pool:
+            modules = list(pool.map(self._import_skill_module, entries))
+
+        for (skill_name, _), module in zip(entries, modules):
+            if module is None:
                 continue
-                
-            skill_path = os.path.join(self.skills_dir, filename)
-            skill_name = filename[:-3]  # Remove .py
-            
             try:
-                spec = importlib.util.spec_from_file_location(skill_name, skill_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                
-                # Look for Skill class or any class inheriting BaseSkill
-                # Also explicitly check for our new skills
-                skill_class = None
-                
-                # Explicit checks for new skills
-                if skill_name == "reminder_skill":
-                    skill_class = getattr(module, "ReminderSkill", None)
-                elif skill_name == "clipboard_skill":
-                    skill_class = getattr(module, "ClipboardSkill", None)
-                elif skill_name == "calendar_skill":
-                    skill_class = getattr(module, "CalendarSkill", None)
-                elif skill_name == "vision_skill":
-                    skill_class = getattr(module, "VisionSkill", None)
-                elif skill_name == "mcp_skill":
-                    skill_class = getattr(module, "MCPSkill", None)
-                    
-                # Standard check
+                skill_class = self._find_skill_class(skill_name, module)
                 if not skill_class:
-                    for attr_name in dir(module):
-                        attr = getattr(module, attr_name)
-                        if (isinstance(attr, type) and 
-                            issubclass(attr, BaseSkill) and 
-                            attr is not BaseSkill):
-                            skill_class = attr
-                            break
-                    
-                # Fallback for simpler non-BaseSkill classes (duck typing)
-                if not skill_class:
-                     for attr_name in dir(module):
-                        attr = getattr(module, attr_name)
-                        if isinstance(attr, type) and attr_name.endswith("Skill"):
-                             skill_class = attr
-                             break
-
-                if skill_class:
-                    skill_instance = skill_class()
-                    
-                    # Inject dependencies if needed
-                    # ReminderSkill needs TTS callback
-                    if skill_name == "reminder_skill" and hasattr(skill_instance, "set_tts_callback") and getattr(self, "tts", None):
-                        skill_instance.set_tts_callback(self.tts)
-                        
-                    # Use name attribute or class name
-                    name = getattr(skill_instance, "name", skill_name.replace("_skill", ""))
-                    self.skills[name] = skill_instance
-                    print(f"   ✅ Loaded: {name}")
-                    
+                    continue
+                skill_instance = skill_class()
+
+                # Inject dependencies if needed
+                # ReminderSkill needs TTS callback
+                if skill_name == "reminder_skill" and hasattr(skill_instance, "set_tts_callback") and getattr(self, "tts", None):
+                    skill_instance.set_tts_callback(self.tts)
+
+                # Use name attribute or class name
+                name = getattr(skill_instance, "name", skill_name.replace("_skill", ""))
+                self.skills[name] = skill_instance
+                print(f"   ✅ Loaded: {name}")
             except Exception as e:
-                print(f"   ⚠️ Failed to load {filename}: {e}")
-        
+                print(f"   ⚠️ Failed to load {skill_name}: {e}")
+
         print(f"   Total skills: {len(self.skills)}")
+        self._build_keyword_index()
+        self._build_classifier_prompt()
+
+    def _build_classifier_prompt(self):
+        """Precompute the static parts of the classifier prompt.
+
+        The skill list only changes when skills are (re)loaded, yet the
+        old code re-joined descriptions and re-rendered the template on
+        every ambiguous utterance.
+        """
+        skill_list = ", ".join(
+            f"{name}: {skill.description}"
+            for name, skill in self.skills.items()
+        )
+        self._classifier_prefix = (
+            'Classify this user request into one of these skills, or '
+            '"general" if none match.\n'
+            f'Skills: {skill_list}\n\n'
+            'If the skill is "general" AND the request can be answered in '
+            'one short sentence, put the answer in "answer"; otherwise '
+            'leave it empty.\n'
+            'Respond with JSON only: '
+            '{"skill": "<name or general>", "answer": "<answer or empty>"}\n\n'
+            'User: "'
+        )
+        # Off-thread: one embed call against a possibly-cold server
+        # shouldn't hold up startup
+        threading.Thread(target=self._build_skill_embeddings, daemon=True).start()
+
+    def _build_skill_embeddings(self):
+        """Embed every skill description once for vector classification"""
+        try:
+            names = list(self.skills)
+            texts = [f"{name}: {self.skills[name].description}" for name in names]
+            response = self._ollama.embed(model=self._embed_model, input=texts)
+            embs = np.asarray(response["embeddings"], dtype=np.float32)
+            embs /= np.linalg.norm(embs, axis=1, keepdims=True)
+            self._emb_names = names
+            self._skill_embs = embs
+            print(f"   ✅ Skill embeddings ready ({self._embed_model})")
+        except Exception as e:
+            print(f"   ⚠️ Skill embeddings unavailable: {e}")
+            self._skill_embs = None
+
+    @staticmethod
+    def _import_skill_module(entry):
+        """Import one skill module; returns None on failure"""
+        skill_name, skill_path = entry
+        try:
+            spec = importlib.util.spec_from_file_location(skill_name, skill_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+        except Exception as e:
+            print(f"   ⚠️ Failed to load {skill_name}: {e}")
+            return None
+
+    def _find_skill_class(self, skill_name: str, module) -> Optional[type]:
+        """Resolve the skill class exported by a module"""
+        explicit = self._EXPLICIT_SKILL_CLASSES.get(skill_name)
+        if explicit:
+            skill_class = getattr(module, explicit, None)
+            if skill_class:
+                return skill_class
+
+        # One getmembers pass instead of two dir() + getattr loops
+        classes = inspect.getmembers(module, inspect.isclass)
+        for _, attr in classes:
+            if issubclass(attr, BaseSkill) and attr is not BaseSkill:
+                return attr
+        # Fallback for simpler non-BaseSkill classes (duck typing)
+        for attr_name, attr in classes:
+            if attr_name.endswith("Skill"):
+                return attr
+        return None
+
+    def _build_keyword_index(self):
+        """Compile all skill keywords into one alternation regex"""
+        self._kw_to_skill = {}
+        self._no_keyword_skills = []
+        for skill in self.skills.values():
+            keywords = getattr(skill, "keywords", None)
+            if keywords:
+                for kw in keywords:
+                    self._kw_to_skill.setdefault(kw.lower(), skill)
+            else:
+                self._no_keyword_skills.append(skill)
+        if self._kw_to_skill:
+            # Longest alternatives first so "play music" beats "play"
+            pattern = "|".join(
+                re.escape(kw)
+                for kw in sorted(self._kw_to_skill, key=len, reverse=True)
+            )
+            self._kw_regex = re.compile(r"(?i)\b(" + pattern + r")\b")
+        else:
+            self._kw_regex = None
     
     async def route(self, text: str, context: Dict[str, Any]) -> Optional[Union[str, SkillResponse]]:
         """
@@ -119,7 +228,7 @@ class SkillRouter:
                 return None
         
         # Phase 2: LLM classification for ambiguous queries
-        classified_skill = await self._llm_classify(text)
+        classified_skill, direct_answer = await self._llm_classify(text)
         
         if classified_skill and classified_skill in self.skills:
             print(f"   🧠 LLM classified: {classified_skill}")
@@ -128,51 +237,86 @@ class SkillRouter:
             except Exception as e:
                 print(f"   ⚠️ Skill error: {e}")
                 return None
+
+        # The classifier already produced a usable general answer; the
+        # tokens are paid for, so speak them instead of decoding the
+        # same reply again through the big model
+        if direct_answer:
+            print("   💬 Classifier answered directly")
+            return direct_answer
         
         # No skill matched - let main LLM handle it
         return None
     
     def _keyword_match(self, text: str) -> Optional[BaseSkill]:
-        """Fast keyword-based skill matching"""
-        for skill in self.skills.values():
+        """Fast keyword-based skill matching.
+
+        One pass of a precompiled alternation regex instead of looping
+        every skill's keyword list per utterance; the regex engine scans
+        the text once regardless of how many skills are loaded.
+        """
+        if self._kw_regex is not None:
+            match = self._kw_regex.search(text)
+            if match:
+                return self._kw_to_skill[match.group(1).lower()]
+        # Skills without a declared keyword list keep their own matches()
+        for skill in self._no_keyword_skills:
             if skill.matches(text):
                 return skill
         return None
     
-    async def _llm_classify(self, text: str) -> Optional[str]:
-        """Use small LLM to classify intent"""
+    def _embed_classify(self, text: str) -> Optional[str]:
+        """Classify by cosine similarity against skill descriptions"""
+        response = self._ollama.embed(model=self._embed_model, input=text)
+        q = np.asarray(response["embeddings"][0], dtype=np.float32)
+        q /= np.linalg.norm(q)
+        scores = self._skill_embs @ q
+        best = int(np.argmax(scores))
+        if scores[best] >= EMBED_SIM_THRESHOLD:
+            return self._emb_names[best]
+        return None
+
+    async def _llm_classify(self, text: str) -> tuple:
+        """Classify intent: embeddings first, generative LLM fallback.
+
+        Returns (skill_name, direct_answer); either may be None. The
+        generative path asks for JSON and lets the classifier answer
+        trivial general queries itself, so those cost one small-model
+        call instead of classify-then-chat.
+        """
         if not self.skills:
-            return None
-            
-        skill_list = ", ".join([
-            f"{name}: {skill.description}" 
-            for name, skill in self.skills.items()
-        ])
-        
-        prompt = f"""Classify this user request into one of these skills, or respond "general" if none match.
-Skills: {skill_list}
+            return None, None
 
-User: "{text}"
-Respond with ONLY the skill name or "general". Nothing else."""
+        # One embed + dot product replaces a generative completion; the
+        # 0.55 floor sends everything ambiguous to "general"
+        if self._skill_embs is not None:
+            try:
+                return self._embed_classify(text), None
+            except Exception as e:
+                print(f"   ⚠️ Embed classify failed: {e}")
+
+        prompt = self._classifier_prefix + text + self._classifier_suffix
         
         try:
-            response = ollama.chat(
+            response = self._ollama.chat(
                 model=self._classifier_model,
                 messages=[{"role": "user", "content": prompt}],
-                options={"num_predict": 20}  # Very short response
+                format="json",  # constrained decoding, no prose to strip
+                options={"num_predict": 80}
             )
-            result = response['message']['content'].strip().lower()
-            
-            # Clean up response
-            result = result.replace('"', '').replace("'", "").strip()
-            
-            if result == "general":
-                return None
-            return result if result in self.skills else None
+            data = json.loads(response['message']['content'])
+            skill = str(data.get("skill", "")).strip().lower()
+            answer = str(data.get("answer", "")).strip()
+
+            if skill in self.skills:
+                return skill, None
+            if skill == "general" and answer and len(answer) <= 200:
+                return None, answer
+            return None, None
             
         except Exception as e:
             print(f"   ⚠️ Classification failed: {e}")
-            return None
+            return None, None
     
     def get_skill_names(self) -> List[str]:
         """Get list of loaded skill names"""
@@ -1,41 +1,42 @@
 """
 Spotify API Controller - Background control of Spotify using the Web API
 """
-import os
-import sys
+import time
 import logging
 from typing import Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
 
-# Add parent to path for config import
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-try:
-    import spotipy
-    from spotipy.oauth2 import SpotifyOAuth
-    SPOTIPY_AVAILABLE = True
-except ImportError:
-    SPOTIPY_AVAILABLE = False
-    logger.warning("spotipy not installed. Run: pip install spotipy")
+# Imported lazily by _init_client; rebound here so except clauses can
+# reference spotipy.exceptions once a client exists
+spotipy = None
 
 from config import SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, SPOTIFY_REDIRECT_URI
 
+# Device list rarely changes mid-session; cache the resolved ID briefly
+# so every command doesn't pay an extra API round-trip
+DEVICE_TTL_S = 10.0
+
 
 class SpotifyController:
     """Controls Spotify playback via the Web API (works in background!)"""
     
     def __init__(self):
-        self._sp: Optional[spotipy.Spotify] = None
+        self._sp = None  # spotipy.Spotify; untyped to keep the import lazy
         self._available = False
+        self._device_cache = (None, 0.0)  # (device_id, monotonic stamp)
         self._init_client()
     
     def _init_client(self):
         """Initialize Spotify client with OAuth"""
-        if not SPOTIPY_AVAILABLE:
-            logger.warning("Spotipy library not available")
+        global spotipy
+        try:
+            import spotipy
+            from spotipy.oauth2 import SpotifyOAuth
+        except ImportError:
+            logger.warning("spotipy not installed. Run: pip install spotipy")
             return
-            
+
         if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
             logger.warning("Spotify API credentials not configured")
             return
@@ -51,8 +52,31 @@ class SpotifyController:
                 scope=scope,
                 cache_path=".spotify_cache"  # Cache token locally
             )
-            
-            self._sp = spotipy.Spotify(auth_manager=auth_manager)
+
+            # One pooled session for every API call: spotipy's default
+            # opens a fresh TCP+TLS connection per request (~100-200ms
+            # of handshake before each command). The adapter retries
+            # transient 5xx/429 with backoff; retries=0 turns off
+            # spotipy's own blocking retry loop in favor of it.
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(
+                max_retries=Retry(
+                    total=2,
+                    backoff_factor=0.3,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                ),
+                pool_connections=10,
+                pool_maxsize=10,
+            ))
+            self._sp = spotipy.Spotify(
+                auth_manager=auth_manager,
+                requests_session=session,
+                retries=0,
+            )
             self._available = True
             logger.info("✅ Spotify API connected!")
             
@@ -64,22 +88,45 @@ class SpotifyController:
     def is_available(self) -> bool:
         return self._available and self._sp is not None
     
-    def _get_active_device(self) -> Optional[str]:
-        """Get the ID of an active Spotify device"""
+    def _get_active_device(self, force_refresh: bool = False) -> Optional[str]:
+        """Get the ID of an active Spotify device (cached ~10s)"""
         if not self.is_available:
             return None
+        device_id, stamp = self._device_cache
+        if device_id and not force_refresh \
+                and time.monotonic() - stamp < DEVICE_TTL_S:
+            return device_id
         try:
             devices = self._sp.devices()
             if devices and devices.get("devices"):
                 # Prefer active device, otherwise first available
+                device_id = devices["devices"][0]["id"]
                 for device in devices["devices"]:
                     if device.get("is_active"):
-                        return device["id"]
-                # No active device, return first one
-                return devices["devices"][0]["id"]
+                        device_id = device["id"]
+                        break
+                self._device_cache = (device_id, time.monotonic())
+                return device_id
         except Exception as e:
             logger.error(f"Failed to get devices: {e}")
+        self._device_cache = (None, 0.0)
         return None
+
+    def _start_playback(self, **kwargs):
+        """start_playback with one retry against a refreshed device.
+
+        A cached device ID can go stale (Spotify closed on that machine);
+        the API answers 404/NO_ACTIVE_DEVICE, so refetch once and retry
+        before giving up.
+        """
+        try:
+            self._sp.start_playback(device_id=self._get_active_device(), **kwargs)
+        except spotipy.exceptions.SpotifyException as e:
+            if e.http_status == 404 or "NO_ACTIVE_DEVICE" in str(e):
+                device_id = self._get_active_device(force_refresh=True)
+                self._sp.start_playback(device_id=device_id, **kwargs)
+            else:
+                raise
     
     def search_and_play(self, query: str) -> str:
         """Search for a track and play it (BACKGROUND - no window focus needed!)"""
@@ -99,11 +146,8 @@ class SpotifyController:
             track_name = track["name"]
             artist_name = track["artists"][0]["name"] if track.get("artists") else "Unknown"
             
-            # Get device to play on
-            device_id = self._get_active_device()
-            
-            # Start playback
-            self._sp.start_playback(device_id=device_id, uris=[track_uri])
+            # Start playback (device resolution + stale-device retry inside)
+            self._start_playback(uris=[track_uri])
             
             return f"Playing '{track_name}' by {artist_name}"
             
@@ -121,8 +165,7 @@ class SpotifyController:
         if not self.is_available:
             return "Spotify API not available"
         try:
-            device_id = self._get_active_device()
-            self._sp.start_playback(device_id=device_id)
+            self._start_playback()
             return "Resumed playback"
         except Exception as e:
             logger.error(f"Play failed: {e}")
@@ -4,16 +4,39 @@ Speech-to-Text using faster-whisper with Silero VAD
 import numpy as np
 from faster_whisper import WhisperModel
 import torch
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, Generator, Union
 import sys
 import os
 import time
+import hashlib
+import threading
+from collections import OrderedDict
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import (
     WHISPER_MODEL, WHISPER_DEVICE, WHISPER_COMPUTE_TYPE,
     SAMPLE_RATE, VAD_THRESHOLD, SILENCE_DURATION_MS, MIN_SPEECH_DURATION_MS
 )
+from assistant._audio_kernels import int16_to_float32
+
+# Dummy-inference cadence that keeps Whisper weights resident; idle
+# eviction otherwise adds a 1-2s reload stall to the first query after
+# a quiet stretch
+WHISPER_KEEPALIVE_S = 240.0
+
+# Frames coalesced per VAD forward call (~128ms): at 512-sample shapes
+# the ONNX dispatch overhead dominates the actual compute, so batching
+# cuts the per-frame cost roughly by the batch size while keeping
+# endpoint latency well under 150ms
+VAD_BATCH_FRAMES = 4
+
+# Recent (audio fingerprint -> transcription) pairs; voice commands
+# repeat ("stop", "next"), and a hit skips the whole Whisper decode
+TX_CACHE_SIZE = 64
+
+# Captures with less voiced audio than this are coughs and false wakes,
+# not commands - not worth a Whisper forward pass
+MIN_VOICED_MS = 300
 
 
 class SpeechToText:
@@ -23,19 +46,57 @@ class SpeechToText:
         self.whisper_model: Optional[WhisperModel] = None
         self.vad_model = None
         self.vad_utils = None
-        self._audio_buffer: List[bytes] = []
+        self._audio_buffer = bytearray()
+        # Scratch buffer for VAD: _check_speech runs ~30x/s, and a fresh
+        # float32 array + torch tensor per call is pure allocator churn.
+        # The tensor wraps the numpy buffer, so writing into _vad_float
+        # updates what the model sees - no copy, no new tensor.
+        self._vad_float = np.empty(512, dtype=np.float32)
+        self._vad_tensor = torch.from_numpy(self._vad_float)
+        self._vad_batch = np.empty((VAD_BATCH_FRAMES, 512), dtype=np.float32)
+        self._vad_batch_tensor = torch.from_numpy(self._vad_batch)
+        self._warm_timer: Optional[threading.Timer] = None
+        self._tx_cache: OrderedDict = OrderedDict()
         
+    @staticmethod
+    def _pick_compute_type() -> str:
+        """Pick the fastest quantization the device actually supports.
+
+        Transcription is memory-bandwidth-bound on the decoder; int8
+        weights halve the bytes moved. Tensor-Core GPUs (compute
+        capability 7.0+) take int8 weights with float16 activations,
+        Pascal-era cards do plain float16, anything older or CPU runs
+        int8.
+        """
+        if WHISPER_DEVICE != "cuda":
+            return "int8"
+        try:
+            major, _ = torch.cuda.get_device_capability()
+        except Exception:
+            return WHISPER_COMPUTE_TYPE
+        if major >= 7:
+            return "int8_float16"
+        if major == 6:
+            return "float16"
+        return "int8"
+
     def load_models(self):
         """Load Whisper and VAD models"""
         print("🔄 Loading STT models...")
         
         # Load faster-whisper
+        compute_type = self._pick_compute_type()
         self.whisper_model = WhisperModel(
             WHISPER_MODEL,
             device=WHISPER_DEVICE,
-            compute_type=WHISPER_COMPUTE_TYPE
+            compute_type=compute_type,
+            # Half the cores for CTranslate2; the VAD, audio callback and
+            # TTS threads need the rest, and oversubscription costs more
+            # than it buys
+            cpu_threads=max(1, (os.cpu_count() or 2) // 2),
+            num_workers=1,
         )
-        print(f"   ✅ Whisper model: {WHISPER_MODEL} ({WHISPER_DEVICE.upper()})")
+        print(f"   ✅ Whisper model: {WHISPER_MODEL} ({WHISPER_DEVICE.upper()}, {compute_type})")
         
         # Load Silero VAD
         self.vad_model, self.vad_utils = torch.hub.load(
@@ -45,6 +106,37 @@ class SpeechToText:
             onnx=True
         )
         print("   ✅ Silero VAD loaded")
+
+        # Warm pass: pages weights in and JITs the CUDA kernels now, so
+        # the first real utterance doesn't pay for it; then keep them
+        # resident with a periodic dummy inference
+        self._warm_whisper()
+        self._schedule_keepalive()
+
+    def _warm_whisper(self):
+        """Run a 1s dummy transcription to keep the model hot"""
+        try:
+            segments, _ = self.whisper_model.transcribe(
+                np.zeros(SAMPLE_RATE, dtype=np.float32), language="en")
+            for _ in segments:
+                pass
+        except Exception as e:
+            print(f"   ⚠️ Whisper warmup: {e}")
+
+    def _schedule_keepalive(self):
+        self._warm_timer = threading.Timer(WHISPER_KEEPALIVE_S, self._keepalive_tick)
+        self._warm_timer.daemon = True
+        self._warm_timer.start()
+
+    def _keepalive_tick(self):
+        self._warm_whisper()
+        self._schedule_keepalive()
+
+    def shutdown(self):
+        """Cancel the keepalive timer"""
+        if self._warm_timer is not None:
+            self._warm_timer.cancel()
+            self._warm_timer = None
         
     def _check_speech(self, audio_chunk: bytes) -> float:
         """
@@ -56,16 +148,33 @@ class SpeechToText:
         if self.vad_model is None:
             return 1.0  # Assume speech if no VAD
         
-        # Convert to float tensor
         audio_int16 = np.frombuffer(audio_chunk, dtype=np.int16)
-        audio_float = audio_int16.astype(np.float32) / 32768.0
-        audio_tensor = torch.from_numpy(audio_float)
-        
-        # Get speech probability
-        speech_prob = self.vad_model(audio_tensor, SAMPLE_RATE).item()
-        return speech_prob
+        if audio_int16.size != self._vad_float.size:
+            # Odd-sized chunk (shouldn't happen with a 512-sample stream):
+            # fall back to the allocating path
+            audio_tensor = torch.from_numpy(
+                audio_int16.astype(np.float32) / 32768.0)
+            return self.vad_model(audio_tensor, SAMPLE_RATE).item()
+
+        # Normalize into the preallocated scratch buffer in one pass
+        int16_to_float32(audio_int16, self._vad_float)
+        return self.vad_model(self._vad_tensor, SAMPLE_RATE).item()
+
+    def _check_speech_batch(self, chunks) -> list:
+        """Speech probabilities for several chunks in one forward call"""
+        if self.vad_model is None:
+            return [1.0] * len(chunks)
+        if len(chunks) != VAD_BATCH_FRAMES:
+            return [self._check_speech(c) for c in chunks]
+        for i, chunk in enumerate(chunks):
+            audio_int16 = np.frombuffer(chunk, dtype=np.int16)
+            if audio_int16.size != self._vad_batch.shape[1]:
+                return [self._check_speech(c) for c in chunks]
+            int16_to_float32(audio_int16, self._vad_batch[i])
+        probs = self.vad_model(self._vad_batch_tensor, SAMPLE_RATE)
+        return probs.view(-1).tolist()
     
-    def listen_with_vad(self, audio_manager, max_duration: float = 15.0) -> Optional[bytes]:
+    def listen_with_vad(self, audio_manager, max_duration: float = 15.0) -> Optional[bytearray]:
         """
         Listen for speech using VAD to detect when user stops speaking
         
@@ -74,12 +183,16 @@ class SpeechToText:
             max_duration: Maximum listening time in seconds
             
         Returns:
-            Complete audio bytes or None if no speech detected
+            Captured audio (int16 bytearray, handed to transcribe
+            without copying) or None if no speech detected
         """
         if self.vad_model is None:
             self.load_models()
         
-        self._audio_buffer = []
+        # One contiguous, growable buffer: a list of chunk objects plus
+        # the final b''.join kept two copies of the utterance alive and
+        # paid an O(N) merge at the end
+        self._audio_buffer = bytearray()
         silence_samples = 0
         speech_samples = 0
         samples_per_chunk = 512  # ~32ms at 16kHz
@@ -88,6 +201,8 @@ class SpeechToText:
         
         start_time = time.time()
         has_speech = False
+        voiced_frames = 0
+        pending = []  # chunks awaiting one batched VAD call
         
         print("👂 Listening... (speak now)")
         
@@ -96,45 +211,134 @@ class SpeechToText:
             if chunk is None:
                 continue
             
-            self._audio_buffer.append(chunk)
-            speech_prob = self._check_speech(chunk)
-            
-            if speech_prob > VAD_THRESHOLD:
-                speech_samples += 1
-                silence_samples = 0
-                if speech_samples >= min_speech_threshold:
-                    has_speech = True
-            else:
-                if has_speech:
+            self._audio_buffer.extend(chunk)
+            pending.append(chunk)
+            if len(pending) < VAD_BATCH_FRAMES:
+                continue
+            probs = self._check_speech_batch(pending)
+            pending.clear()
+
+            done = False
+            for speech_prob in probs:
+                if speech_prob > VAD_THRESHOLD:
+                    speech_samples += 1
+                    voiced_frames += 1
+                    silence_samples = 0
+                    if speech_samples >= min_speech_threshold:
+                        has_speech = True
+                elif has_speech:
                     silence_samples += 1
                     # Check if we've had enough silence to stop
                     if silence_samples >= silence_threshold:
                         print("   🔇 Silence detected, processing...")
+                        done = True
                         break
+            if done:
+                break
         
         if not has_speech:
             print("   ⚠️ No speech detected")
             return None
+
+        voiced_ms = voiced_frames * samples_per_chunk * 1000 // SAMPLE_RATE
+        if voiced_ms < MIN_VOICED_MS:
+            # A cough or false wake: don't hand Whisper ~100s of ms of
+            # work for something that was never a command
+            print(f"   ⚠️ Only {voiced_ms}ms voiced, ignoring")
+            return None
         
-        # Combine all audio chunks
-        return b''.join(self._audio_buffer)
+        # Already contiguous; np.frombuffer downstream accepts a
+        # bytearray without copying
+        return self._audio_buffer
     
-    def transcribe(self, audio_bytes: bytes) -> Tuple[str, float]:
+    def transcribe_stream(
+        self, audio_bytes: Union[bytes, bytearray, memoryview]
+    ) -> Generator[str, None, None]:
+        """Yield segment texts as Whisper decodes them.
+
+        transcribe() drains the whole segment generator before
+        returning, so downstream work starts only after the full
+        decode. faster-whisper yields segments incrementally; handing
+        each one to the caller as it lands lets the LLM/TTS pipeline
+        overlap the remaining decode. Pairs with the sentence-level
+        streaming in llm_router.chat_stream and tts.
+        """
+        if self.whisper_model is None:
+            self.load_models()
+
+        audio_int16 = np.frombuffer(audio_bytes, dtype=np.int16)
+        audio_float = np.empty(audio_int16.size, dtype=np.float32)
+        int16_to_float32(audio_int16, audio_float)
+
+        segments, info = self.whisper_model.transcribe(
+            audio_float,
+            language=None, # Auto-detect language
+            vad_filter=True,
+            vad_parameters=dict(
+                min_silence_duration_ms=500,
+                speech_pad_ms=200
+            )
+        )
+        if info.language != "en":
+            print(f"   🌍 Detected language: {info.language} ({info.language_probability:.0%})")
+
+        for segment in segments:
+            text = segment.text.strip()
+            if text:
+                yield text
+
+    def _voiced_ms(self, audio_bytes) -> float:
+        """Total voiced milliseconds in a buffer, per batched Silero VAD"""
+        if self.vad_model is None:
+            return float('inf')
+        audio_int16 = np.frombuffer(audio_bytes, dtype=np.int16)
+        n_frames = audio_int16.size // 512
+        if n_frames == 0:
+            return 0.0
+        frames = audio_int16[:n_frames * 512].reshape(n_frames, 512) \
+            .astype(np.float32) / 32768.0
+        probs = self.vad_model(torch.from_numpy(frames), SAMPLE_RATE).view(-1)
+        voiced = int((probs > VAD_THRESHOLD).sum())
+        return voiced * 512 * 1000.0 / SAMPLE_RATE
+
+    def transcribe(
+        self, audio_bytes: Union[bytes, bytearray, memoryview],
+        min_voiced_ms: int = 0
+    ) -> Tuple[str, float]:
         """
         Transcribe audio bytes to text
         
         Args:
-            audio_bytes: Raw audio bytes (int16, 16kHz)
+            audio_bytes: Raw int16 16kHz audio; bytes, bytearray and
+                memoryview are all accepted without copying
+                (np.frombuffer shares the underlying memory)
+            min_voiced_ms: If set, re-run VAD over the buffer and skip
+                Whisper entirely when it holds less voiced audio than
+                this (for callers feeding unscreened captures)
             
         Returns:
             Tuple of (transcription, confidence)
         """
         if self.whisper_model is None:
             self.load_models()
+
+        if min_voiced_ms and self._voiced_ms(audio_bytes) < min_voiced_ms:
+            print("   ⚠️ Mostly silence, skipping transcription")
+            return "", 0.0
+
+        # Fingerprint on a 1/32 stride sample: hashing 15s of audio in
+        # full would cost more than it saves
+        key = hashlib.blake2b(bytes(audio_bytes[::32]), digest_size=16).digest()
+        cached = self._tx_cache.get(key)
+        if cached is not None:
+            self._tx_cache.move_to_end(key)
+            print("   ⚡ Transcription cache hit")
+            return cached
         
-        # Convert to numpy float32
+        # Convert to numpy float32 (one fused pass, one allocation)
         audio_int16 = np.frombuffer(audio_bytes, dtype=np.int16)
-        audio_float = audio_int16.astype(np.float32) / 32768.0
+        audio_float = np.empty(audio_int16.size, dtype=np.float32)
+        int16_to_float32(audio_int16, audio_float)
         
         # Transcribe
         segments, info = self.whisper_model.transcribe(
@@ -166,6 +370,10 @@ class SpeechToText:
         # Convert log prob to probability (exp of log prob)
         # Typical values: -0.3 = ~74%, -0.5 = ~60%, -0.7 = ~50%, -1.0 = ~37%
         confidence = min(1.0, max(0.0, np.exp(avg_confidence)))
+
+        self._tx_cache[key] = (text, confidence)
+        while len(self._tx_cache) > TX_CACHE_SIZE:
+            self._tx_cache.popitem(last=False)
         
         return text, confidence
 
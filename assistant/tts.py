@@ -19,12 +19,25 @@ from config import TTS_VOICE, TTS_RATE, TTS_PITCH
 class TextToSpeech:
     """TTS with edge-tts (online) and pyttsx3 (offline fallback)"""
     
-    def __init__(self):
+    def __init__(self, preload_fallback: bool = False):
+        """
+        Args:
+            preload_fallback: Initialize pyttsx3 now instead of on first
+                failure. The fallback fires exactly when edge-tts errors,
+                so lazy init stacks 200-500ms of engine startup on top of
+                the error path; the boot path sets this True.
+        """
         self.voice = TTS_VOICE
         self.rate = TTS_RATE
         self.pitch = TTS_PITCH
         self._pyttsx_engine: Optional[pyttsx3.Engine] = None
+        self._fallback_voice_id: Optional[str] = None
         self._use_fallback = False
+        if preload_fallback:
+            try:
+                self._init_fallback()
+            except Exception as e:
+                print(f"   ⚠️ Fallback TTS preload failed: {e}")
         
     def _init_fallback(self):
         """Initialize pyttsx3 fallback engine"""
@@ -32,12 +45,15 @@ class TextToSpeech:
             self._pyttsx_engine = pyttsx3.init()
             # Configure voice properties
             self._pyttsx_engine.setProperty('rate', 175)  # Words per minute
-            voices = self._pyttsx_engine.getProperty('voices')
-            # Try to find a female voice for consistency
-            for voice in voices:
-                if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
-                    self._pyttsx_engine.setProperty('voice', voice.id)
-                    break
+            if self._fallback_voice_id is None:
+                voices = self._pyttsx_engine.getProperty('voices')
+                # Try to find a female voice for consistency
+                for voice in voices:
+                    if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
+                        self._fallback_voice_id = voice.id
+                        break
+            if self._fallback_voice_id:
+                self._pyttsx_engine.setProperty('voice', self._fallback_voice_id)
             print("   ✅ Fallback TTS (pyttsx3) initialized")
     
     async def synthesize(self, text: str) -> Optional[bytes]:
@@ -117,37 +133,44 @@ class TextToSpeech:
         self._pyttsx_engine.runAndWait()
     
     def _play_mp3(self, mp3_data: bytes):
-        """Play MP3 audio data"""
+        """Play MP3 audio data in-process.
+
+        Spawning a player subprocess cost 50-200ms of fork+startup per
+        utterance (and on Windows raced temp-file deletion against the
+        player). Decoding with pydub straight from memory and handing
+        PCM to the already-loaded sounddevice skips the temp file and
+        the subprocess entirely.
+        """
+        try:
+            from pydub import AudioSegment
+            audio = AudioSegment.from_mp3(io.BytesIO(mp3_data))
+            samples = np.array(audio.get_array_of_samples())
+            if audio.channels > 1:
+                samples = samples.reshape((-1, audio.channels))
+            sd.play(samples, audio.frame_rate, blocking=True)
+            return
+        except ImportError:
+            pass  # no pydub/ffmpeg: last-resort system player below
+        except Exception as e:
+            print(f"   ⚠️ Audio playback error: {e}")
+            return
+
         try:
-            # Save to temp file and play
             with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
                 f.write(mp3_data)
                 temp_path = f.name
-            
-            # Use ffmpeg/pydub if available, otherwise sounddevice
-            try:
-                from pydub import AudioSegment
-                from pydub.playback import play
-                audio = AudioSegment.from_mp3(temp_path)
-                play(audio)
-            except ImportError:
-                # Fallback: use system player
-                if sys.platform == "win32":
-                    os.system(f'start /min wmplayer "{temp_path}"')
-                    import time
-                    time.sleep(len(mp3_data) / 16000)  # Rough estimate
-                else:
-                    os.system(f'mpv --no-video "{temp_path}" 2>/dev/null')
-            
-            # Cleanup
+            if sys.platform == "win32":
+                os.system(f'start /min wmplayer "{temp_path}"')
+                import time
+                time.sleep(len(mp3_data) / 16000)  # Rough estimate
+            else:
+                os.system(f'mpv --no-video "{temp_path}" 2>/dev/null')
             try:
                 os.unlink(temp_path)
             except:
                 pass
-                
         except Exception as e:
             print(f"   ⚠️ Audio playback error: {e}")
-            self._speak_fallback(text)
     
     async def speak_streaming(self, text: str):
         """
@@ -12,6 +12,11 @@ from config import (
     PICOVOICE_ACCESS_KEY, PORCUPINE_KEYWORD_PATH
 )
 
+# openWakeWord's native stride: 80ms of 16kHz audio. Feeding smaller
+# chunks makes it recompute the melspectrogram over overlapping windows;
+# exact frames keep the incremental feature path hot
+OWW_FRAME = 1280
+
 class WakeWordDetector:
     """Detects wake word using Porcupine (priority) or openWakeWord (fallback)"""
     
@@ -21,6 +26,15 @@ class WakeWordDetector:
         self.oww_model = None
         self.porcupine = None
         self.use_porcupine = False
+        # Residual int16 samples carried between openWakeWord calls so
+        # every predict() sees exactly OWW_FRAME samples
+        self._oww_buf = np.empty(OWW_FRAME * 2, dtype=np.int16)
+        self._oww_buf_len = 0
+        self._oww_thresholds = {}
+        # Same carry-over scheme for Porcupine frames; sized in
+        # load_model once frame_length is known
+        self._porc_buf = None
+        self._porc_buf_len = 0
         
     def load_model(self):
         """Load the wake word model"""
@@ -56,6 +70,8 @@ class WakeWordDetector:
                     )
                     
                 self.use_porcupine = True
+                self._porc_buf = np.empty(
+                    self.porcupine.frame_length + 8192, dtype=np.int16)
                 print(f"✅ Porcupine loaded! Keywords: {keywords or 'Custom Model'}")
                 return
             except Exception as e:
@@ -69,6 +85,10 @@ class WakeWordDetector:
             wakeword_models=[WAKE_WORD_MODEL],
             inference_framework="onnx"
         )
+        # Per-model thresholds for predict()'s debounce handling
+        self._oww_thresholds = {
+            name: self.threshold for name in self.oww_model.models
+        }
         print(f"✅ openWakeWord loaded: '{WAKE_WORD_MODEL}'")
     
     def process_audio(self, audio_chunk: bytes) -> bool:
@@ -80,52 +100,87 @@ class WakeWordDetector:
 
     def _process_porcupine(self, audio_chunk: bytes) -> bool:
         """Process using Porcupine"""
-        # Porcupine expects int16 array
+        # Porcupine requires exactly frame_length samples per process()
+        # call. Chunks usually match (both default to 512), but when
+        # they don't, the old code silently dropped the audio - missed
+        # frames the detector never heard.
         pcm = np.frombuffer(audio_chunk, dtype=np.int16)
-        
-        # Porcupine requires exactly frame_length samples
-        # We might need to handle buffering if chunks don't match
-        # But for simplicity, we assume chunk size matches or we skip
-        # A better implementation would buffer.
-        # For now, we'll try to process what fits. 
-        # Note: Porcupine frame length is usually 512, which matches our CHUNK_SIZE
+        frame_length = self.porcupine.frame_length
+        detected = False
         
         try:
-            result = self.porcupine.process(pcm)
-            if result >= 0:
-                print("🎯 Wake word detected (Porcupine)!")
-                if self.on_wake:
-                    self.on_wake()
-                return True
+            if self._porc_buf_len == 0 and pcm.size == frame_length:
+                # Aligned stream (the common case): no copy needed
+                if self.porcupine.process(pcm) >= 0:
+                    detected = True
+            else:
+                # Carry partial frames across calls so nothing is lost
+                if self._porc_buf_len + pcm.size > self._porc_buf.size:
+                    self._porc_buf_len = 0  # pathological backlog; resync
+                self._porc_buf[self._porc_buf_len:self._porc_buf_len + pcm.size] = pcm
+                self._porc_buf_len += pcm.size
+
+                offset = 0
+                while self._porc_buf_len - offset >= frame_length:
+                    if self.porcupine.process(
+                            self._porc_buf[offset:offset + frame_length]) >= 0:
+                        detected = True
+                    offset += frame_length
+                leftover = self._porc_buf_len - offset
+                if offset and leftover:
+                    self._porc_buf[:leftover] = \
+                        self._porc_buf[offset:self._porc_buf_len]
+                self._porc_buf_len = leftover
         except Exception:
             pass
-            
-        return False
+
+        if detected:
+            print("🎯 Wake word detected (Porcupine)!")
+            if self.on_wake:
+                self.on_wake()
+        return detected
 
     def _process_oww(self, audio_chunk: bytes) -> bool:
         """Process using openWakeWord"""
         if self.oww_model is None:
             self.load_model()
         
-        # Convert bytes to numpy array
+        # Accumulate until a full native frame is available; predict()
+        # on partial chunks recomputes mel features over overlapping
+        # windows instead of striding incrementally
         audio_data = np.frombuffer(audio_chunk, dtype=np.int16)
+        n = audio_data.size
+        if self._oww_buf_len + n > self._oww_buf.size:
+            self._oww_buf_len = 0  # shouldn't happen; drop stale residue
+        self._oww_buf[self._oww_buf_len:self._oww_buf_len + n] = audio_data
+        self._oww_buf_len += n
+
+        detected = False
+        while self._oww_buf_len >= OWW_FRAME:
+            # openWakeWord takes 16-bit PCM directly; converting to
+            # normalized float32 allocated a fresh 5KB array per 80ms
+            # frame (~GB/hour of churn on an always-on loop) for nothing
+            frame = self._oww_buf[:OWW_FRAME]
+            # debounce_time suppresses the score for 1s after a trigger,
+            # so there is no need to reset() (which would throw away the
+            # mel buffer and deafen the detector for several frames)
+            prediction = self.oww_model.predict(
+                frame,
+                threshold=self._oww_thresholds,
+                debounce_time=1.0,
+            )
+            leftover = self._oww_buf_len - OWW_FRAME
+            self._oww_buf[:leftover] = self._oww_buf[OWW_FRAME:self._oww_buf_len]
+            self._oww_buf_len = leftover
+
+            for model_name, score in prediction.items():
+                if score > self.threshold:
+                    print(f"🎯 Wake word detected! Score: {score:.3f}")
+                    if self.on_wake:
+                        self.on_wake()
+                    detected = True
         
-        # openWakeWord expects float32 normalized audio
-        audio_float = audio_data.astype(np.float32) / 32768.0
-        
-        # Run prediction
-        prediction = self.oww_model.predict(audio_float)
-        
-        # Check all wake word scores
-        for model_name, score in self.oww_model.prediction_buffer.items():
-            if len(score) > 0 and score[-1] > self.threshold:
-                print(f"🎯 Wake word detected! Score: {score[-1]:.3f}")
-                self.oww_model.reset()
-                if self.on_wake:
-                    self.on_wake()
-                return True
-        
-        return False
+        return detected
     
     def reset(self):
         """Reset the wake word buffer"""
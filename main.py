@@ -70,7 +70,7 @@ class VoiceAssistant:
         self.stt = SpeechToText()
         self.stt.load_models()
         self.llm = LLMRouter()
-        self.tts = TextToSpeech()
+        self.tts = TextToSpeech(preload_fallback=True)
         
         self.skill_router = SkillRouter(
             llm_router=self.llm,